@@ -0,0 +1,114 @@
+"""
+Build time and lookup latency of the category index at 100k+ item names.
+
+Synthetic product names are built from brand/descriptor/product vocabularies.
+Lookups are timed for exact names and for OCR-mangled names (dropped, doubled
+or swapped characters), and the fuzzy hit rate is reported. --vocabulary N adds
+a pseudo-word from an N-word vocabulary to every name, so the trigram posting
+lists get as long as they would with a real product catalogue.
+
+Run from the repository root:
+    python -m benchmarks.category_index_benchmark --names 100000 --vocabulary 50000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from src.knowledge_graph.category_index import CategoryIndex
+
+BRANDS = ["Great Value", "Kirkland", "Organic", "Market Pantry", "Horizon", "Tillamook", "Dole", "Chobani",
+          "Oroweat", "Tyson", "Lays", "Barilla", "Tide", "Bounty", "Simply", "Nature Valley", "Quaker", "Heinz"]
+DESCRIPTORS = ["Whole", "Low Fat", "Fresh", "Frozen", "Sliced", "Large", "Family Size", "Unsweetened", "Spicy",
+               "Original", "Classic", "Lite", "Extra Virgin", "Boneless", "Seedless", "Roasted", "Salted"]
+PRODUCTS = {
+    "Dairy": ["Milk", "Cheddar Cheese", "Greek Yogurt", "Butter", "Cream Cheese", "Eggs"],
+    "Fruits": ["Bananas", "Apples", "Strawberries", "Grapes", "Blueberries", "Mango"],
+    "Vegetables": ["Tomatoes", "Potatoes", "Spinach", "Broccoli", "Carrots", "Onions"],
+    "Bakery": ["Bread", "Bagels", "Croissants", "Tortillas", "Muffins"],
+    "Meat": ["Chicken Breast", "Ground Beef", "Bacon", "Pork Chops", "Turkey"],
+    "Snacks": ["Potato Chips", "Granola Bars", "Pretzels", "Crackers", "Popcorn"],
+    "Household": ["Paper Towels", "Laundry Detergent", "Dish Soap", "Trash Bags"],
+    "Beverages": ["Orange Juice", "Sparkling Water", "Cold Brew Coffee", "Green Tea"],
+}
+
+
+SYLLABLES = ["ka", "lo", "mi", "tre", "sna", "po", "qui", "zer", "bel", "dor", "fin", "gra", "hu", "ja", "vel",
+             "rin", "sto", "ple", "cru", "ma"]
+
+
+def pseudo_words(count, rng):
+    words = set()
+    for _ in range(count):
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic_names(count, rng, vocabulary=()):
+    names = {}
+    while len(names) < count:
+        category = rng.choice(list(PRODUCTS))
+        name = f"{rng.choice(BRANDS)} {rng.choice(DESCRIPTORS)} {rng.choice(PRODUCTS[category])} {rng.randint(1, 999)}"
+        if vocabulary:
+            name = f"{name} {rng.choice(vocabulary)}"
+        names[name] = category
+    return names
+
+
+def mangle(name, rng):
+    """Simulates OCR damage: one dropped, doubled or swapped character."""
+    i = rng.randrange(1, len(name) - 1)
+    op = rng.choice(["drop", "double", "swap"])
+    if op == "drop":
+        return name[:i] + name[i + 1:]
+    if op == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+
+
+def time_lookups(index, queries):
+    """Wall-clock and thread CPU time per lookup; CPU time leaves out scheduler stalls on a busy host."""
+    for query in queries[:100]:  # warm-up
+        index.lookup(query)
+    timings, cpu_timings, results = [], [], []
+    for query in queries:
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        results.append(index.lookup(query))
+        cpu_timings.append(time.thread_time() - cpu_start)
+        timings.append(time.perf_counter() - start)
+    return timings, cpu_timings, results
+
+
+def percentile(sorted_timings, fraction):
+    return sorted_timings[int(len(sorted_timings) * fraction)] * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--names", type=int, default=100000)
+    arg_parser.add_argument("--queries", type=int, default=5000)
+    arg_parser.add_argument("--vocabulary", type=int, default=0, help="extra pseudo-words to draw from")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = synthetic_names(args.names, rng, pseudo_words(args.vocabulary, rng))
+
+    start = time.perf_counter()
+    index = CategoryIndex()
+    index.add_many(names.items())
+    print(f"Indexed {len(index):,} names in {time.perf_counter() - start:.2f}s")
+
+    sample = rng.sample(list(names), args.queries)
+    for label, queries in [("exact", sample), ("ocr-mangled", [mangle(name, rng) for name in sample])]:
+        timings, cpu_timings, results = time_lookups(index, queries)
+        correct = sum(1 for name, result in zip(sample, results) if result == names[name])
+        timings.sort()
+        cpu_timings.sort()
+        print(f"{label:<12} mean {statistics.mean(timings) * 1e6:7.1f}us  p50 {percentile(timings, 0.5):7.1f}us  "
+              f"p99 {percentile(timings, 0.99):7.1f}us  cpu p99 {percentile(cpu_timings, 0.99):7.1f}us  "
+              f"correct {correct / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
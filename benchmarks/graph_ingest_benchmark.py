@@ -0,0 +1,210 @@
+"""
+Round trips and throughput of bill ingestion into the grocery graph.
+
+Compares the original per-item `session.run` loop (kept here as the reference)
+with the UNWIND-based `store_grocery_data` (one transaction per bill) and the
+bulk `store_bills` (many bills per transaction).
+
+By default a stand-in driver is used: it counts statements, transactions and
+network round trips and sleeps `--rtt-ms` per round trip, so the numbers show
+what latency the write path pays without needing a database. With `--live` the
+same workloads run against NEO4J_URI; benchmark data is written under a
+throwaway user and deleted afterwards.
+
+Run from the repository root:
+    python -m benchmarks.graph_ingest_benchmark --bills 200 --items 25 --rtt-ms 1
+    python -m benchmarks.graph_ingest_benchmark --live --bills 200
+"""
+import argparse
+import random
+import time
+import uuid
+
+from src.knowledge_graph.neo4j_connector import GroceryGraph, extract_numeric_quantity
+
+BENCH_USER = "benchmark-user"
+CATEGORIES = ["dairy", "bakery", "fruits", "vegetables", "meat", "snacks", "beverages", "household"]
+
+
+class StandInResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def single(self):
+        return self.rows[0] if self.rows else None
+
+    def data(self):
+        return list(self.rows)
+
+
+class StandInDriver:
+    """
+    Fake Neo4j driver for counting. Each auto-commit `session.run` is one round trip;
+    a managed transaction costs one round trip per statement (BEGIN is pipelined with
+    the first one) plus one for COMMIT.
+    """
+
+    def __init__(self, rtt_seconds):
+        self.rtt_seconds = rtt_seconds
+        self.counters = {"statements": 0, "transactions": 0, "round_trips": 0}
+
+    def _round_trip(self):
+        self.counters["round_trips"] += 1
+        time.sleep(self.rtt_seconds)
+
+    def _run(self, query, parameters=None, **kwargs):
+        parameters = {**(parameters or {}), **kwargs}
+        self.counters["statements"] += 1
+        self._round_trip()
+        if "bills" in parameters:  # STORE_BILLS_QUERY: pretend every bill is new
+            return StandInResult([{"bill_id": bill["bill_id"], "item_count": len(bill["items"])}
+                                  for bill in parameters["bills"]])
+        return StandInResult([])
+
+    def session(self):
+        return StandInSession(self)
+
+    def close(self):
+        pass
+
+
+class StandInSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        self.driver.counters["transactions"] += 1
+        return self.driver._run(query, parameters, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        self.driver.counters["transactions"] += 1
+        result = work(StandInTransaction(self.driver), *args, **kwargs)
+        self.driver._round_trip()  # COMMIT
+        return result
+
+
+class StandInTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, parameters=None, **kwargs):
+        return self.driver._run(query, parameters, **kwargs)
+
+
+# Original implementation, kept here as the round-trip reference
+def legacy_store_grocery_data(driver, user, purchases, bill_id):
+    with driver.session() as session:
+        existing_bill = session.run("MATCH (b:Bill {id: $bill_id}) RETURN b", bill_id=bill_id).single()
+        if existing_bill:
+            return
+        session.run("MERGE (b:Bill {id: $bill_id})", bill_id=bill_id)
+        for purchase in purchases:
+            session.run("""
+                MERGE (u:User {name: $user})
+                MERGE (b:Bill {id: $bill_id})
+                MERGE (u)-[:BOUGHT]->(b)
+                MERGE (i:Item {name: $item_name})
+                ON CREATE SET i.total_frequency = 0
+                MERGE (c:Category {name: $category})
+                MERGE (i)-[:BELONGS_TO]->(c)
+                MERGE (b)-[:CONTAINS]->(i)
+                MERGE (u)-[:BOUGHT]->(i)
+                SET i.price = $price,
+                    i.quantity = $quantity,
+                    i.total_frequency = coalesce(i.total_frequency, 0) + $quantity
+            """, user=user, bill_id=bill_id, item_name=purchase["item"],
+                category=purchase.get("category", "Uncategorized").strip().lower(),
+                price=float(purchase.get("price", 0)),
+                quantity=extract_numeric_quantity(purchase.get("quantity", "1")))
+
+
+def synthetic_bills(count, items_per_bill, rng, prefix):
+    bills = []
+    for _ in range(count):
+        purchases = [{
+            "item": f"{prefix} item {rng.randint(1, 2000)}",
+            "quantity": f"{rng.randint(1, 4)} pcs",
+            "price": f"{rng.uniform(0.5, 20):.2f}",
+            "category": rng.choice(CATEGORIES),
+        } for _ in range(items_per_bill)]
+        bills.append({"user": BENCH_USER, "bill_id": f"{prefix}-{uuid.uuid4().hex[:12]}", "purchases": purchases})
+    return bills
+
+
+def graph_with_driver(driver):
+    graph = GroceryGraph.__new__(GroceryGraph)  # skip __init__: the driver is supplied
+    graph.driver = driver
+    return graph
+
+
+def cleanup_live(driver, prefix):
+    with driver.session() as session:
+        session.run("MATCH (i:Item) WHERE i.name STARTS WITH $prefix DETACH DELETE i", prefix=prefix)
+        session.run("MATCH (b:Bill) WHERE b.id STARTS WITH $prefix DETACH DELETE b", prefix=prefix)
+        session.run("MATCH (s) WHERE (s:CategorySpend OR s:MonthlySpend) AND s.user = $user DETACH DELETE s",
+                    user=BENCH_USER)
+        session.run("MATCH (u:User {name: $user}) DETACH DELETE u", user=BENCH_USER)
+        # Categories the run created have nothing left pointing at them; real ones still have items
+        session.run("MATCH (c:Category) WHERE c.name IN $categories AND NOT (c)--() DELETE c",
+                    categories=[category.strip().lower() for category in CATEGORIES])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--bills", type=int, default=200)
+    arg_parser.add_argument("--items", type=int, default=25, help="purchase lines per bill")
+    arg_parser.add_argument("--batch-size", type=int, default=50, help="bills per transaction for store_bills")
+    arg_parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated round-trip time (stand-in driver)")
+    arg_parser.add_argument("--live", action="store_true", help="use the Neo4j at NEO4J_URI instead of the stand-in")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    live_graph = GroceryGraph() if args.live else None
+
+    def make_driver():
+        return live_graph.driver if live_graph else StandInDriver(args.rtt_ms / 1000)
+
+    workloads = {
+        "legacy per-item run": lambda driver, bills: [
+            legacy_store_grocery_data(driver, bill["user"], bill["purchases"], bill["bill_id"]) for bill in bills],
+        "store_grocery_data": lambda driver, bills: [
+            graph_with_driver(driver).store_grocery_data(bill["user"], bill["purchases"], bill["bill_id"])
+            for bill in bills],
+        f"store_bills x{args.batch_size}": lambda driver, bills: graph_with_driver(driver).store_bills(
+            bills, batch_size=args.batch_size),
+    }
+
+    print(f"{args.bills} bills x {args.items} items, " + ("live Neo4j" if args.live else f"stand-in driver, {args.rtt_ms}ms RTT"))
+    print(f"{'workload':<24}{'round trips/bill':>18}{'tx/bill':>10}{'bills/s':>10}{'items/s':>10}")
+    for name, workload in workloads.items():
+        prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        bills = synthetic_bills(args.bills, args.items, rng, prefix)
+        driver = make_driver()
+        start = time.perf_counter()
+        workload(driver, bills)
+        elapsed = time.perf_counter() - start
+        if isinstance(driver, StandInDriver):
+            round_trips = f"{driver.counters['round_trips'] / args.bills:.2f}"
+            transactions = f"{driver.counters['transactions'] / args.bills:.2f}"
+        else:
+            round_trips = transactions = "-"
+            cleanup_live(driver, prefix)
+        print(f"{name:<24}{round_trips:>18}{transactions:>10}{args.bills / elapsed:>10.0f}"
+              f"{args.bills * args.items / elapsed:>10.0f}")
+
+    if live_graph:
+        live_graph.close()
+
+
+if __name__ == "__main__":
+    main()
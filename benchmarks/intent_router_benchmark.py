@@ -0,0 +1,120 @@
+"""
+Coverage, accuracy and latency of the /ask intent router.
+
+A labelled corpus of question phrasings (the template each one should hit, or
+None for questions that must fall back to GPT-4) is routed repeatedly. The
+report shows how many questions skip the intent + Cypher-generation GPT-4 calls,
+how many were routed to the wrong template (or routed when they shouldn't be),
+and the per-question routing latency.
+
+Run from the repository root:
+    python -m benchmarks.intent_router_benchmark --rounds 200
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+
+from src.api.intent_router import route_question
+
+# Categories as the API knows them (CategoryIndex.categories(): lowercased, as stored)
+KNOWN_CATEGORIES = {"dairy", "bakery", "fruits", "vegetables", "meat", "snacks", "beverages", "produce", "spices"}
+
+# (question, expected template or None)
+CORPUS = [
+    ("what is my most expensive item?", "most_expensive_item"),
+    ("what's the priciest thing i bought", "most_expensive_item"),
+    ("show my top 5 most expensive items", "most_expensive_item"),
+    ("which item cost the most?", None),  # ambiguous wording, left to GPT-4
+    ("what is my cheapest item", "cheapest_item"),
+    ("top 3 cheapest items", "cheapest_item"),
+    ("on what did i spend the most?", "top_category"),
+    ("which category do i spend the most on?", "top_category"),
+    ("what is my biggest category", "top_category"),
+    ("where did i spend the most money", "top_category"),
+    ("how much did i spend on produce, bakery, and snacks?", "category_spend"),
+    ("how much did i spend on dairy?", "category_spend"),
+    ("how much money have i spent on meat", "category_spend"),
+    ("what did i spend on fruits and vegetables", "category_spend"),
+    ("total spent on snacks & beverages", "category_spend"),
+    ("how much did i pay for bakery items", "category_spend"),
+    ("how much have i spent in total?", "total_spend"),
+    ("how much did i spend on groceries", "total_spend"),
+    ("what's my total spend", "total_spend"),
+    ("show me spending by category", "spend_by_category"),
+    ("give me a category breakdown", "spend_by_category"),
+    ("how much do i spend per category", "spend_by_category"),
+    ("what item do i buy the most?", "most_frequent_item"),
+    ("what items do i buy most often", "most_frequent_item"),
+    ("what are my most purchased items", "most_frequent_item"),
+    ("what is my favourite item", "most_frequent_item"),
+    ("how much did i spend on milk", None),  # items, not categories: GPT-4 answers from the purchases
+    ("how much did i spend on bananas?", None),
+    ("how much did i pay for cheddar and bread", None),
+    ("how much did i spend on dairy and milk", None),
+    ("what is the most expensive item in dairy?", None),  # category-qualified item questions
+    ("what is the cheapest dairy product?", None),
+    ("what's the priciest thing from the bakery", None),
+    ("top 3 cheapest snacks", None),
+    ("what fruit do i buy the most", None),
+    ("what is the total cost of dairy?", None),  # qualified totals and rankings the templates can't apply
+    ("what was my total bill for dairy?", None),
+    ("how much did i spend at walmart?", None),
+    ("how much did i spend per item?", None),
+    ("how much tax did i pay?", None),
+    ("which item did i spend the most on?", None),
+    ("what is the most expensive item i bought twice?", None),
+    ("what's the cheapest thing i bought only once", None),
+    ("how much did i spend on dairy last month?", "category_spend"),  # date-range variants
+    ("what did i spend this week", "total_spend"),
+    ("how much did i spend in september", "total_spend"),
+    ("spending by category this year", "spend_by_category"),
+    ("what was my most expensive item last month", None),
+    ("what did you tell me earlier about snacks", None),
+    ("should i buy organic milk?", None),
+    ("suggest a cheaper alternative to cheddar", None),
+    ("is my spending on snacks higher than on fruits?", None),
+    ("what is my average bill", None),
+    ("which category do i buy the most from", None),
+    ("how much did i spend on that thing from the store near my house", None),
+    ("can you recommend a healthy breakfast", None),
+    ("what is a good recipe with bananas", None),
+    ("hello", None),
+]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--rounds", type=int, default=200, help="passes over the corpus for latency")
+    args = arg_parser.parse_args()
+
+    outcomes = Counter()
+    for question, expected in CORPUS:
+        routed = route_question(question, known_categories=KNOWN_CATEGORIES)
+        name = routed.template.name if routed else None
+        if name == expected:
+            outcomes["routed correctly" if expected else "fell back correctly"] += 1
+        else:
+            outcomes["wrong template" if name and expected else "routed, should fall back" if name else "missed"] += 1
+            print(f"  ✗ {question!r}: expected {expected}, got {name}")
+
+    timings = []
+    for _ in range(args.rounds):
+        for question, _ in CORPUS:
+            start = time.perf_counter()
+            route_question(question, known_categories=KNOWN_CATEGORIES)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    routable = sum(1 for _, expected in CORPUS if expected)
+    routed = sum(1 for question, _ in CORPUS if route_question(question, known_categories=KNOWN_CATEGORIES))
+    print(f"\nquestions: {len(CORPUS)} ({routable} with a matching template)")
+    for outcome in ("routed correctly", "fell back correctly", "missed", "wrong template", "routed, should fall back"):
+        print(f"  {outcome:<26}{outcomes[outcome]:>4}")
+    print(f"coverage: {routed / len(CORPUS):.0%} of questions skip 2 GPT-4 calls (intent + Cypher generation)")
+    print(f"routing latency: mean {statistics.mean(timings) * 1e6:.1f}µs, "
+          f"p50 {timings[len(timings) // 2] * 1e6:.1f}µs, p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
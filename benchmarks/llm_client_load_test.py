@@ -0,0 +1,82 @@
+"""
+Offline tail-latency load test for the shared LLM client.
+
+A fake backend with heavy-tailed latency (lognormal body plus occasional
+multi-second stalls) and random failures is driven from many threads through
+the blocking `predict` wrapper, the way Flask workers call it. Each client
+configuration reports p50/p95/p99/max latency plus timeouts, retries and
+failed calls.
+
+Run from the repository root:
+    python -m benchmarks.llm_client_load_test --requests 400 --threads 32
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.parsing.llm_client import AsyncLLMClient, FakeLLMBackend, LLMCallError
+
+
+def heavy_tail_latency(stall_rate, stall_seconds):
+    def latency(rng):
+        if rng.random() < stall_rate:
+            return stall_seconds
+        return rng.lognormvariate(-1.6, 0.5)  # median ~0.2s
+    return latency
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_load(client, requests, threads):
+    def one_call(i):
+        start = time.perf_counter()
+        try:
+            client.predict(f"prompt {i}")
+            ok = True
+        except LLMCallError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(one_call, range(requests)))
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    return latencies, errors
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--requests", type=int, default=400)
+    arg_parser.add_argument("--threads", type=int, default=32, help="concurrent callers (Flask workers)")
+    arg_parser.add_argument("--stall-rate", type=float, default=0.03)
+    arg_parser.add_argument("--stall-seconds", type=float, default=10.0)
+    arg_parser.add_argument("--failure-rate", type=float, default=0.05)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    configs = [
+        ("no timeout, no retry", dict(max_concurrency=args.threads, timeout=3600, deadline=3600, max_retries=0)),
+        ("timeout 1s, 3 retries", dict(max_concurrency=args.threads, timeout=1.0, deadline=6.0, max_retries=3,
+                                       backoff_base=0.1, backoff_max=1.0)),
+        ("+ concurrency 8", dict(max_concurrency=8, timeout=1.0, deadline=6.0, max_retries=3,
+                                 backoff_base=0.1, backoff_max=1.0)),
+    ]
+
+    print(f"{'config':<24}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'errors':>8}{'timeouts':>10}{'retries':>9}")
+    for name, options in configs:
+        backend = FakeLLMBackend(latency=heavy_tail_latency(args.stall_rate, args.stall_seconds),
+                                 failure_rate=args.failure_rate, seed=args.seed)
+        client = AsyncLLMClient(backend, **options)
+        latencies, errors = run_load(client, args.requests, args.threads)
+        stats = client.stats()
+        print(f"{name:<24}{percentile(latencies, 0.5):>7.2f}s{percentile(latencies, 0.95):>7.2f}s"
+              f"{percentile(latencies, 0.99):>7.2f}s{latencies[-1]:>7.2f}s{errors:>8}"
+              f"{stats['timeouts']:>10}{stats['retries']:>9}")
+    print(f"\nmean of last run: {statistics.mean(latencies):.2f}s over {args.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cold vs warm EasyOCR latency on the sample bills.
+
+Cold = the old behaviour (build a new easyocr.Reader on every call).
+Warm = borrow an already loaded reader from the process-wide pool.
+
+Run from the repository root:
+    python -m benchmarks.ocr_reader_benchmark --repeats 3
+"""
+import argparse
+import statistics
+import time
+
+from src.ocr.reader_pool import ReaderPool
+
+SAMPLE_BILLS = ["data/bill1.jpeg", "data/bill2.jpeg"]
+
+
+def time_cold(image_path, repeats):
+    """Times reader construction + inference, like the pre-pool extract_text_easyocr."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pool = ReaderPool(size=1)
+        with pool.reader() as reader:
+            reader.readtext(image_path, detail=0)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_warm(pool, image_path, repeats):
+    """Times inference only, using a reader that is already loaded."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with pool.reader() as reader:
+            reader.readtext(image_path, detail=0)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("images", nargs="*", default=SAMPLE_BILLS)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    pool = ReaderPool(size=1)
+    start = time.perf_counter()
+    pool.warm_up(1)
+    print(f"Warm-up (one-off reader load): {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'image':<22}{'cold mean':>12}{'warm mean':>12}{'speedup':>10}")
+    for image_path in args.images:
+        cold = statistics.mean(time_cold(image_path, args.repeats))
+        warm = statistics.mean(time_warm(pool, image_path, args.repeats))
+        print(f"{image_path:<22}{cold:>11.2f}s{warm:>11.2f}s{cold / warm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time and accuracy effect of each OCR preprocessing step.
+
+For every image and setting this reports preprocessing time, OCR time and how
+many of the item lines extracted from the raw image (lines that end in a price
+after clean_ocr_text) are still extracted. Pick the fastest setting whose
+recall stays at 100%.
+
+Run from the repository root:
+    python -m benchmarks.preprocessing_benchmark data/*.jpeg uploads/*.jpeg
+"""
+import argparse
+import time
+
+from src.ocr.ocr_extractor import clean_ocr_text, is_price
+from src.ocr.preprocessing import DEFAULT_STEPS, load_image, preprocess_image
+from src.ocr.reader_pool import get_reader_pool
+
+SAMPLE_IMAGES = ["data/bill1.jpeg", "data/bill2.jpeg"]
+
+# Each step on its own, then the steps stacked up in pipeline order
+SETTINGS = [("raw", [])]
+SETTINGS += [(step, [step]) for step in DEFAULT_STEPS]
+SETTINGS += [("+".join(DEFAULT_STEPS[:n]), DEFAULT_STEPS[:n]) for n in range(2, len(DEFAULT_STEPS) + 1)]
+
+
+def item_lines(cleaned_lines):
+    """Cleaned lines that pair an item name with a price."""
+    return {line for line in cleaned_lines if " " in line and is_price(line.rsplit(" ", 1)[-1])}
+
+
+def run_setting(reader, image, steps):
+    start = time.perf_counter()
+    prepared = preprocess_image(image, steps)
+    prep_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw_text = "\n".join(reader.readtext(prepared, detail=0))
+    ocr_time = time.perf_counter() - start
+    return prep_time, ocr_time, item_lines(clean_ocr_text(raw_text))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("images", nargs="*", default=SAMPLE_IMAGES)
+    args = arg_parser.parse_args()
+
+    pool = get_reader_pool()
+    pool.warm_up(1)
+
+    with pool.reader() as reader:
+        for image_path in args.images:
+            image = load_image(image_path)  # decode once so the timings below exclude file I/O
+            print(f"\n{image_path} ({image.shape[1]}x{image.shape[0]})")
+            print(f"  {'setting':<45}{'prep':>8}{'ocr':>8}{'total':>8}{'items':>7}{'recall':>8}")
+
+            baseline = None
+            for name, steps in SETTINGS:
+                prep_time, ocr_time, items = run_setting(reader, image, steps)
+                if baseline is None:
+                    baseline = items
+                recall = len(items & baseline) / len(baseline) if baseline else 1.0
+                print(f"  {name:<45}{prep_time:>7.2f}s{ocr_time:>7.2f}s{prep_time + ocr_time:>7.2f}s"
+                      f"{len(items):>7}{recall:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
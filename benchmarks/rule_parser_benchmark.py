@@ -0,0 +1,90 @@
+"""
+LLM calls and latency saved by the rule-based fast path on the sample bills.
+
+For each bill: OCR it, then compare the old path (whole bill -> GPT-4, one call)
+with parse_grocery_bill_fast (local lines, one GPT-4 call for the leftovers
+and one batched categorisation call for unseen items, if any). With --offline
+no GPT-4 request is made: LLM calls are counted and their latency is estimated
+with --llm-latency.
+
+Run from the repository root:
+    python -m benchmarks.rule_parser_benchmark            # real GPT-4 calls
+    python -m benchmarks.rule_parser_benchmark --offline  # counts only
+"""
+import argparse
+import time
+
+from src.ocr.ocr_extractor import extract_text_easyocr
+from src.parsing import rule_parser
+from src.parsing.langchain_parser import parse_grocery_bill, categorize_items
+
+SAMPLE_BILLS = ["data/bill1.jpeg", "data/bill2.jpeg"]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("images", nargs="*", default=SAMPLE_BILLS)
+    arg_parser.add_argument("--offline", action="store_true", help="count LLM calls instead of making them")
+    arg_parser.add_argument("--llm-latency", type=float, default=8.0, help="assumed seconds per GPT-4 call (offline)")
+    args = arg_parser.parse_args()
+
+    llm_calls = []
+    if args.offline:
+        def llm(text):
+            llm_calls.append(text)
+            return []
+
+        def categorize(names):
+            llm_calls.append(names)
+            return {}
+    else:
+        def llm(text):
+            llm_calls.append(text)
+            return parse_grocery_bill(text)
+
+        def categorize(names):
+            llm_calls.append(names)
+            return categorize_items(names)
+    # Route both paths through the counting wrappers
+    rule_parser.parse_grocery_bill = llm
+    rule_parser.categorize_items = categorize
+
+    print(f"{'bill':<20}{'lines':>7}{'local':>7}{'to LLM':>8}{'calls old/new':>15}{'old':>9}{'new':>9}")
+    totals = {"old_calls": 0, "new_calls": 0, "old_time": 0.0, "new_time": 0.0}
+    for image_path in args.images:
+        text = extract_text_easyocr(image_path)
+
+        llm_calls.clear()
+        _, old_time = timed(llm, text)
+        old_calls = len(llm_calls)
+
+        llm_calls.clear()
+        stats = {}
+        _, new_time = timed(rule_parser.parse_grocery_bill_fast, text, stats=stats)
+        new_calls = len(llm_calls)
+
+        if args.offline:
+            old_time += old_calls * args.llm_latency
+            new_time += new_calls * args.llm_latency
+
+        lines = stats["local_lines"] + stats["llm_lines"]
+        print(f"{image_path:<20}{lines:>7}{stats['local_lines']:>7}{stats['llm_lines']:>8}"
+              f"{f'{old_calls}/{new_calls}':>15}{old_time:>8.2f}s{new_time:>8.2f}s")
+        totals["old_calls"] += old_calls
+        totals["new_calls"] += new_calls
+        totals["old_time"] += old_time
+        totals["new_time"] += new_time
+
+    print(f"\nLLM calls: {totals['old_calls']} -> {totals['new_calls']}")
+    print(f"Parse latency: {totals['old_time']:.2f}s -> {totals['new_time']:.2f}s"
+          + (" (estimated)" if args.offline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Same ingest and query workloads against each GroceryStore backend.
+
+Synthetic bills (spread over the last `--months` months) are written with
+store_bills, then the spend queries used by /spending and /ask are timed:
+per-category totals, one category, monthly totals and a one-month date range.
+When more than one backend runs, their query results are compared so the
+embedded store can stand in for Neo4j in tests.
+
+The SQLite backend needs no services. The Neo4j backend uses NEO4J_URI and writes
+under a throwaway user that is removed afterwards.
+
+Run from the repository root:
+    python -m benchmarks.store_backend_benchmark --backends sqlite --bills 2000
+    python -m benchmarks.store_backend_benchmark --backends sqlite,neo4j --bills 500
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.knowledge_graph.grocery_store import create_store
+
+BENCH_USER = "benchmark-user"
+CATEGORIES = ["dairy", "bakery", "fruits", "vegetables", "meat", "snacks", "beverages", "household"]
+
+
+def synthetic_bills(count, items_per_bill, months, rng):
+    now = datetime.now(timezone.utc)
+    bills = []
+    for _ in range(count):
+        purchases = [{
+            "item": f"bench item {rng.randint(1, 2000)}",
+            "quantity": f"{rng.randint(1, 4)} pcs",
+            "price": f"{rng.uniform(0.5, 20):.2f}",
+            "category": rng.choice(CATEGORIES),
+        } for _ in range(items_per_bill)]
+        purchased_at = now - timedelta(days=rng.uniform(0, 30 * months))
+        bills.append({"user": BENCH_USER, "bill_id": f"bench-{uuid.uuid4().hex[:12]}",
+                      "purchases": purchases, "purchased_at": purchased_at})
+    return bills
+
+
+def time_calls(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def cleanup_neo4j(store):
+    with store.driver.session() as session:
+        session.run("MATCH (b:Bill) WHERE b.id STARTS WITH 'bench-' DETACH DELETE b")
+        session.run("MATCH (i:Item) WHERE i.name STARTS WITH 'bench item' DETACH DELETE i")
+        session.run("MATCH (s) WHERE (s:CategorySpend OR s:MonthlySpend) AND s.user = $user DETACH DELETE s",
+                    user=BENCH_USER)
+        session.run("MATCH (u:User {name: $user}) DETACH DELETE u", user=BENCH_USER)
+
+
+def rounded(result):
+    return {key: round(value, 2) for key, value in result.items()}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--backends", default="sqlite", help="comma-separated: sqlite,neo4j")
+    arg_parser.add_argument("--bills", type=int, default=2000)
+    arg_parser.add_argument("--items", type=int, default=25, help="purchase lines per bill")
+    arg_parser.add_argument("--months", type=int, default=12, help="history the bills are spread over")
+    arg_parser.add_argument("--batch-size", type=int, default=200, help="bills per transaction")
+    arg_parser.add_argument("--repeat", type=int, default=50, help="runs of each query")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    bills = synthetic_bills(args.bills, args.items, args.months, random.Random(args.seed))
+    today = datetime.now(timezone.utc).date()
+    month_start = today.replace(day=1)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    queries = {
+        "spending by category": lambda store: store.query_spending_by_category(user=BENCH_USER),
+        "one category": lambda store: {"dairy": store.query_total_spent("dairy", user=BENCH_USER)},
+        "monthly spending": lambda store: store.query_monthly_spending(user=BENCH_USER),
+        "last month by category": lambda store: store.query_spending_between(
+            last_month_start.isoformat(), month_start.isoformat(), user=BENCH_USER),
+    }
+
+    print(f"{args.bills} bills x {args.items} items over {args.months} months")
+    print(f"{'backend':<8}{'workload':<26}{'p50':>10}{'p95':>10}{'throughput':>16}")
+    results = {}
+    for backend in args.backends.split(","):
+        sqlite_path = os.path.join(tempfile.mkdtemp(), "grocery.sqlite3")
+        store = create_store(backend, sqlite_path=sqlite_path)
+        store.migrate_schema()
+        try:
+            start = time.perf_counter()
+            store.store_bills(bills, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{backend:<8}{'ingest (store_bills)':<26}{'':>10}{'':>10}"
+                  f"{args.bills * args.items / elapsed:>10.0f} items/s")
+
+            results[backend] = {}
+            for name, query in queries.items():
+                timings, result = time_calls(lambda: query(store), args.repeat)
+                timings.sort()
+                results[backend][name] = rounded(result)
+                print(f"{backend:<8}{name:<26}{statistics.median(timings) * 1000:>8.2f}ms"
+                      f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f}ms{len(timings) / sum(timings):>10.0f} q/s")
+        finally:
+            if backend == "neo4j":
+                cleanup_neo4j(store)
+            store.close()
+
+    if len(results) > 1:
+        reference, *others = results
+        for backend in others:
+            mismatched = [name for name in queries if results[backend][name] != results[reference][name]]
+            print(f"\n{backend} vs {reference}: " + (f"results differ for {', '.join(mismatched)}" if mismatched
+                                                     else "identical results for every query"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Micro-benchmark of the compiled single-pass OCR text cleaner.
+
+Generates synthetic 10k-line OCR dumps (item names, prices, boilerplate and
+noise), checks the new cleaner returns exactly what the original
+clean_ocr_text/merge_multiline_entries returned, and times both.
+
+Run from the repository root:
+    python -m benchmarks.text_cleaner_benchmark --lines 10000 --dumps 20
+"""
+import argparse
+import random
+import re
+import time
+
+from src.ocr.text_cleaner import iter_clean_lines
+
+ITEM_WORDS = ["MILK", "BREAD", "BANANA", "Organic", "Apple", "Cheddar", "CHEESE", "EGGS", "Lg", "Tomato",
+              "Potato", "Garlic", "Yogurt", "Chicken", "Breast", "Coffee", "lb", "Ib", "b", "Whole", "2%"]
+BOILERPLATE = ["Your cashier was MARY", "TAX 0.54", "TOTAL 23.10", "VISA CREDIT", "Balance due", "AUTH #0412",
+               "CHANGE 0.00", "Card ending 1234", "AMOUNT 23.10", "Your Savings 2.00", "Payment approved"]
+NOISE = ["***", "#1234 @", "--------", "(S)", "  ", "", "1,99", "3,49 F", "You Paid"]
+
+
+# Original implementation, kept here as the correctness and speed reference
+def legacy_is_price(line):
+    return bool(re.match(r'^\d+(\.\d{2})$', line.strip()))
+
+
+def legacy_merge_multiline_entries(lines):
+    cleaned_lines = []
+    temp_line = ""
+    for line in lines:
+        line = line.strip()
+        if legacy_is_price(line):
+            if temp_line:
+                cleaned_lines.append(f"{temp_line} {line}")
+                temp_line = ""
+            else:
+                cleaned_lines.append(line)
+        else:
+            temp_line = line
+    return cleaned_lines
+
+
+def legacy_clean_ocr_text(raw_text):
+    cleaned_lines = []
+    for line in raw_text.split("\n"):
+        line = line.strip()
+        if any(ignore_word in line.lower() for ignore_word in ["your cashier", "tax", "total", "payment", "credit", "balance", "auth", "change", "card", "amount", "savings"]):
+            continue
+        line = re.sub(r'[^\w\s\.\$,]', '', line)
+        line = re.sub(r'(\d+),(\d{2})', r'\1.\2', line)
+        line = re.sub(r'\b(lb|Ib|Jb|b)\b', '', line, flags=re.IGNORECASE)
+        line = line.strip()
+        if line:
+            cleaned_lines.append(line)
+    return legacy_merge_multiline_entries(cleaned_lines)
+
+
+def synthetic_dump(n_lines, rng):
+    """Builds an OCR-like dump: mostly item/price pairs plus boilerplate and noise."""
+    lines = []
+    while len(lines) < n_lines:
+        roll = rng.random()
+        if roll < 0.6:
+            lines.append(" ".join(rng.choices(ITEM_WORDS, k=rng.randint(1, 4))))
+            lines.append(f"{rng.randint(0, 30)}.{rng.randint(0, 99):02d}")
+        elif roll < 0.8:
+            lines.append(rng.choice(BOILERPLATE))
+        else:
+            lines.append(rng.choice(NOISE))
+    return "\n".join(lines[:n_lines])
+
+
+def best_time(fn, dumps, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for dump in dumps:
+            fn(dump)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--lines", type=int, default=10000)
+    arg_parser.add_argument("--dumps", type=int, default=20)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    dumps = [synthetic_dump(args.lines, rng) for _ in range(args.dumps)]
+
+    def compiled(raw_text):
+        return list(iter_clean_lines(raw_text))
+
+    for dump in dumps:
+        assert compiled(dump) == legacy_clean_ocr_text(dump), "compiled cleaner output differs from legacy"
+    print(f"Outputs identical on {args.dumps} dumps x {args.lines} lines")
+
+    legacy = best_time(legacy_clean_ocr_text, dumps, args.rounds)
+    new = best_time(compiled, dumps, args.rounds)
+    total_lines = args.lines * args.dumps
+    print(f"legacy:   {legacy:.3f}s ({total_lines / legacy:,.0f} lines/s)")
+    print(f"compiled: {new:.3f}s ({total_lines / new:,.0f} lines/s)")
+    print(f"speedup:  {legacy / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Tiled vs whole-image OCR on long receipts.
+
+The sample bills are stacked vertically (--stack N) to mimic warehouse-club
+receipts several thousand pixels tall. For each image this reports wall time,
+peak RSS growth of the process and how many whole-image text lines the tiled
+run also found.
+
+Run from the repository root:
+    python -m benchmarks.tiling_benchmark --stack 4 --workers 2
+"""
+import argparse
+import resource
+import time
+
+import cv2
+import numpy as np
+
+from src.ocr.preprocessing import load_image
+from src.ocr.reader_pool import get_reader_pool
+from src.ocr.tiling import OCR_TILE_HEIGHT, OCR_TILE_OVERLAP, OCR_TILE_MEMORY_MB, extract_detections_tiled
+
+SAMPLE_BILLS = ["data/bill1.jpeg", "data/bill2.jpeg"]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def tall_receipt(paths, stack):
+    """Stacks the sample bills (at a common width) into one long image."""
+    images = [load_image(path) for path in paths]
+    width = min(image.shape[1] for image in images)
+    images = [cv2.resize(image, (width, round(image.shape[0] * width / image.shape[1])), interpolation=cv2.INTER_AREA)
+              for image in images]
+    return np.vstack([images[i % len(images)] for i in range(stack * len(images))])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("images", nargs="*", default=SAMPLE_BILLS)
+    arg_parser.add_argument("--stack", type=int, default=4, help="copies of each bill in the tall image")
+    arg_parser.add_argument("--workers", type=int, default=2, help="concurrent strips (readers in the pool)")
+    arg_parser.add_argument("--tile-height", type=int, default=OCR_TILE_HEIGHT)
+    arg_parser.add_argument("--overlap", type=int, default=OCR_TILE_OVERLAP)
+    arg_parser.add_argument("--memory-mb", type=int, default=OCR_TILE_MEMORY_MB)
+    args = arg_parser.parse_args()
+
+    pool = get_reader_pool()
+    pool.size = max(pool.size, args.workers)
+    pool.warm_up(args.workers)
+
+    image = tall_receipt(args.images, args.stack)
+    print(f"Tall receipt: {image.shape[1]}x{image.shape[0]} px\n")
+
+    # Tiled first: ru_maxrss only grows, so the whole-image peak is measured second
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    tiled = extract_detections_tiled(image, strip_height=args.tile_height, overlap=args.overlap,
+                                     memory_mb=args.memory_mb, workers=args.workers)
+    tiled_time = time.perf_counter() - start
+    tiled_peak = peak_rss_mb() - rss_before
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    with pool.reader() as reader:
+        whole = reader.readtext(image, detail=1)
+    whole_time = time.perf_counter() - start
+    whole_peak = peak_rss_mb() - rss_before
+
+    whole_lines = [text for _, text, _ in whole]
+    tiled_lines = [text for _, text, _ in tiled]
+    found = sum(1 for line in set(whole_lines) if line in set(tiled_lines))
+
+    print(f"{'mode':<8}{'time':>9}{'peak RSS +':>13}{'lines':>8}")
+    print(f"{'whole':<8}{whole_time:>8.2f}s{whole_peak:>10.0f} MB{len(whole_lines):>8}")
+    print(f"{'tiled':<8}{tiled_time:>8.2f}s{tiled_peak:>10.0f} MB{len(tiled_lines):>8}")
+    print(f"\nWhole-image lines also found by tiling: {found}/{len(set(whole_lines))}")
+    print(f"Speedup: {whole_time / tiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from dotenv import load_dotenv
+
+from src.knowledge_graph.graph_version import graph_generation
+
+# Load answer cache settings
+load_dotenv()
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "true").lower() in ("1", "true", "yes")
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s$&]")
+
+
+def normalize_question(question):
+    """Lowercases and drops punctuation and extra whitespace: 'What's my total?' -> 'whats my total'."""
+    return " ".join(_PUNCTUATION_RE.sub("", question.lower()).split())
+
+
+class AnswerCache:
+    """
+    In-memory LRU of final /ask answers, checked before any LLM or graph work. Keys are
+    (session, normalised question, graph generation, today's date): a stored bill or a new
+    day ("this week", "last month") makes earlier answers unreachable, and entries also
+    expire after `ttl_seconds`. The key doesn't cover the conversation history, so only
+    answers that don't read it should be stored.
+    """
+
+    def __init__(self, ttl_seconds=ANSWER_CACHE_TTL_SECONDS, max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                 generation=graph_generation, enabled=ANSWER_CACHE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generation = generation
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (payload, stored_at), least recently used first
+
+    def _key(self, session_id, question):
+        return session_id, normalize_question(question), self.generation.current(), date.today().isoformat()
+
+    def get(self, session_id, question):
+        """Returns the cached payload for this session's question, or None."""
+        if not self.enabled:
+            return None
+        key = self._key(session_id, question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self.ttl_seconds and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, session_id, question, payload, generation=None):
+        """
+        Stores an answer. Pass the `generation` read before answering, so an answer built
+        while a bill was being stored isn't kept under the newer generation.
+        """
+        if not self.enabled:
+            return
+        key = self._key(session_id, question)
+        if generation is not None and generation != key[2]:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (payload, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear_session(self, session_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session_id]:
+                del self._entries[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
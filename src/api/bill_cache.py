@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load cache settings
+load_dotenv()
+BILL_CACHE_DIR = os.getenv("BILL_CACHE_DIR", "cache/bills")
+BILL_CACHE_MAX_BYTES = int(os.getenv("BILL_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+def hash_image_bytes(image_bytes):
+    """SHA-256 of the uploaded image bytes (the cache key)."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def bill_id_for_hash(image_hash):
+    """Stable bill id for an image, so re-uploads hit the duplicate-bill check."""
+    return image_hash[:16]
+
+
+class BillCache:
+    """
+    Content-addressed on-disk cache of OCR + parse results, one JSON file per image hash.
+    File mtimes record last access; the least recently used entries are evicted once the
+    directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=BILL_CACHE_DIR, max_bytes=BILL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()  # image hash -> file size, least recently used first
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _path(self, image_hash):
+        return os.path.join(self.cache_dir, f"{image_hash}.json")
+
+    def _scan(self):
+        """Rebuilds the LRU order from the files already on disk."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, image_hash, size in sorted(entries):
+            self._sizes[image_hash] = size
+            self._total_bytes += size
+
+    def _forget(self, image_hash):
+        self._total_bytes -= self._sizes.pop(image_hash, 0)
+
+    def get(self, image_hash):
+        """Returns the cached entry for an image hash, or None."""
+        path = self._path(image_hash)
+        with self._lock:
+            try:
+                with open(path, "r") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                self._forget(image_hash)
+                return None
+            except ValueError:
+                # Corrupt entry: drop it and recompute
+                self._forget(image_hash)
+                os.remove(path)
+                return None
+
+            os.utime(path)  # mark as recently used
+            if image_hash in self._sizes:
+                self._sizes.move_to_end(image_hash)
+            return entry
+
+    def put(self, image_hash, raw_text, cleaned_lines, structured_data, bill_id):
+        """Stores the results for an image and evicts old entries if over budget."""
+        payload = json.dumps({
+            "bill_id": bill_id,
+            "raw_text": raw_text,
+            "cleaned_lines": cleaned_lines,
+            "structured_data": structured_data,
+            "created_at": datetime.now().isoformat(),
+        })
+        path = self._path(image_hash)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)  # atomic, so readers never see half-written entries
+
+            self._forget(image_hash)
+            self._sizes[image_hash] = os.path.getsize(path)
+            self._total_bytes += self._sizes[image_hash]
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._sizes) > 1:
+            oldest, size = self._sizes.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(oldest))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict, deque, namedtuple
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load conversation memory settings
+load_dotenv()
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "cache/conversations.sqlite3")
+CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "4"))  # messages per session given to GPT-4
+CONVERSATION_CACHED_SESSIONS = int(os.getenv("CONVERSATION_CACHED_SESSIONS", "1000"))  # sessions kept in RAM
+CONVERSATION_KEEP_MESSAGES = int(os.getenv("CONVERSATION_KEEP_MESSAGES", "200"))  # per session on disk; 0 = all
+
+DEFAULT_SESSION_ID = "default"  # requests that don't send a session_id share this one
+
+Message = namedtuple("Message", ["role", "content", "created_at"])  # role: "human" or "ai"
+
+
+def new_session_id():
+    return str(uuid.uuid4())[:8]
+
+
+class ConversationStore:
+    """
+    Append-only conversation log in SQLite: each message is one INSERT, however long
+    the history. The last `max_messages` of recently used sessions are kept in RAM and
+    loaded lazily (one indexed query) the first time a session is read; past
+    `max_sessions`, the least recently used session is dropped from RAM, not from disk.
+    On disk each session keeps its last `keep_messages` messages (at least `max_messages`);
+    older ones are deleted as new ones are appended.
+    """
+
+    def __init__(self, path=CONVERSATION_DB_PATH, max_messages=CONVERSATION_MAX_MESSAGES,
+                 max_sessions=CONVERSATION_CACHED_SESSIONS, keep_messages=CONVERSATION_KEEP_MESSAGES):
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self.keep_messages = max(keep_messages, max_messages) if keep_messages else 0
+        self.counters = {"messages_written": 0, "messages_trimmed": 0, "session_loads": 0, "session_evictions": 0}
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session id -> deque of Message, least recently used first
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def _session(self, session_id):
+        """The in-RAM window for a session, loading it from disk if needed. Caller holds the lock."""
+        messages = self._sessions.get(session_id)
+        if messages is not None:
+            self._sessions.move_to_end(session_id)
+            return messages
+        rows = self._conn.execute(
+            "SELECT role, content, created_at FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, self.max_messages),
+        ).fetchall()
+        messages = deque((Message(*row) for row in reversed(rows)), maxlen=self.max_messages)
+        self._sessions[session_id] = messages
+        self.counters["session_loads"] += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.counters["session_evictions"] += 1
+        return messages
+
+    def get_messages(self, session_id):
+        """The session's most recent messages (up to `max_messages`), oldest first."""
+        with self._lock:
+            return list(self._session(session_id))
+
+    def add_messages(self, session_id, *messages):
+        """Appends (role, content) pairs to the session in one transaction, trimming its oldest messages."""
+        created_at = datetime.now().isoformat()
+        rows = [Message(role, content, created_at) for role, content in messages]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                    [(session_id, *row) for row in rows],
+                )
+                if self.keep_messages:
+                    # Only the newest messages are ever read; one indexed delete keeps the log bounded
+                    trimmed = self._conn.execute(
+                        "DELETE FROM messages WHERE session_id = ? AND id < "
+                        "(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (session_id, session_id, self.keep_messages - 1),
+                    ).rowcount
+                    self.counters["messages_trimmed"] += trimmed
+            self.counters["messages_written"] += len(rows)
+            if session_id in self._sessions:  # not loaded yet: the next read picks these up from disk
+                self._sessions[session_id].extend(rows)
+
+    def add_message(self, session_id, content, is_human=True):
+        self.add_messages(session_id, ("human" if is_human else "ai", content))
+
+    def clear(self, session_id):
+        """Deletes a session's history."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._sessions.pop(session_id, None)
+
+    def import_json_memory(self, memory_file, session_id=DEFAULT_SESSION_ID):
+        """
+        One-off import of the old memory.json (MemoryManager's full-rewrite format) into
+        `session_id`; the file is renamed afterwards so it is only imported once.
+        """
+        if not os.path.exists(memory_file):
+            return 0
+        try:
+            with open(memory_file, "r") as f:
+                messages = json.load(f).get("messages", [])
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not import {memory_file}: {e}")
+            return 0
+        self.add_messages(session_id, *[("human" if msg.get("type") == "human" else "ai", msg["content"])
+                                        for msg in messages if msg.get("content")])
+        os.replace(memory_file, memory_file + ".imported")
+        print(f"✅ Imported {len(messages)} messages from {memory_file} into session {session_id!r}")
+        return len(messages)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "sessions_in_memory": len(self._sessions)}
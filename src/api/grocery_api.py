@@ -1,101 +1,106 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import os, uuid, re, json
-from src.ocr.ocr_extractor import extract_text_easyocr
-from src.parsing.langchain_parser import parse_grocery_bill
-from src.knowledge_graph.neo4j_connector import GroceryGraph, get_existing_labels_and_relationships
-from src.knowledge_graph.query_handler import query_total_spent  # if needed
-from langchain.prompts import PromptTemplate
-from langchain.chat_models import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import HumanMessage, AIMessage
-import requests
+import os, re, json, asyncio, time
+from src.ocr.ocr_extractor import extract_text_easyocr, extract_receipt_rows, clean_ocr_text
+from src.ocr.row_reconstruction import rows_to_lines
+from src.ocr.reader_pool import warm_up_reader_pool
+from src.parsing.langchain_parser import parse_grocery_bill, get_llm_cache, llm_client
+from src.parsing.rule_parser import PARSER_FAST_PATH, parse_grocery_bill_fast
+from src.parsing.llm_client import LLMCallError
+from src.knowledge_graph.neo4j_connector import get_grocery_graph, get_existing_labels_and_relationships, CATEGORY_MAPPING
+from src.knowledge_graph.grocery_store import GROCERY_STORE_BACKEND, InvalidBill, get_grocery_store
+from src.knowledge_graph.category_index import CategoryIndex
+from src.knowledge_graph.schema_cache import SchemaCache
+from src.knowledge_graph.result_cache import query_cache
+from src.knowledge_graph.graph_version import graph_generation
+from src.knowledge_graph.write_queue import (GRAPH_WRITE_QUEUE, GRAPH_WRITE_DURABLE_TIMEOUT, GraphWriteQueue,
+                                             WriteQueueFull)
+from src.knowledge_graph.query_handler import query_total_spent, query_spending_by_category
+from src.api.bill_cache import BillCache, hash_image_bytes, bill_id_for_hash
+from src.api.stage_timings import StageTimings, StageStats
+from src.api.intent_router import ASK_INTENT_ROUTER, route_question
+from src.api.answer_cache import AnswerCache
+from src.api.conversation_store import ConversationStore, DEFAULT_SESSION_ID
 from datetime import datetime
+import threading
 
 app = Flask(__name__)
 CORS(app)
 
-grocery_graph = GroceryGraph()
+# Creating the store doesn't connect yet (the Neo4j driver connects on first use), so the
+# module imports without a database; startup() below does the first round trips
+grocery_store = get_grocery_store()  # shared with query_handler: one driver, one connection pool
+# /ask runs Cypher, so it needs the graph; with GROCERY_STORE_BACKEND=sqlite there is no Neo4j at all
+grocery_graph = get_grocery_graph() if GROCERY_STORE_BACKEND == "neo4j" else None
+GRAPH_MIGRATE_ON_STARTUP = os.getenv("GRAPH_MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Bills are written by background workers in batched transactions, so /upload_bill can
+# answer once parsing is done (GRAPH_WRITE_QUEUE=false writes inline as before)
+graph_writes = GraphWriteQueue(grocery_store) if GRAPH_WRITE_QUEUE else None
+
+# Item -> category lookups, learned from the stored bills at startup; only unseen items are sent to GPT-4
+category_index = CategoryIndex.from_mapping(CATEGORY_MAPPING)
+
+_started = False
+_startup_lock = threading.Lock()
+
+
+def startup():
+    """
+    Work that needs the database: schema migrations (GRAPH_MIGRATE_ON_STARTUP=false leaves
+    them to `python -m src.knowledge_graph.schema_migrations`) and loading the stored item
+    categories. Runs once, before the first request; a failure is retried on the next one.
+    """
+    global _started
+    if _started:
+        return
+    with _startup_lock:
+        if _started:
+            return
+        # Uniqueness constraints keep MERGE and Bill lookups on index seeks
+        if GRAPH_MIGRATE_ON_STARTUP:
+            grocery_store.migrate_schema()
+        category_index.add_many(grocery_store.item_categories())
+        _started = True
+
+
+@app.before_request
+def _startup_before_first_request():
+    startup()
 
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# Load EasyOCR weights once at startup so /upload_bill only pays for inference
+# (OCR_READER_WARMUP=0 defers loading to the first upload)
+warm_up_reader_pool()
+
+# OCR_ROW_MODE pairs items with prices from box positions before parsing
+OCR_ROW_MODE = os.getenv("OCR_ROW_MODE", "false").lower() in ("1", "true", "yes")
+
+# OCR + parse results keyed by image hash, so re-uploads skip EasyOCR and GPT-4
+bill_cache = BillCache()
+
 # Load OpenAI API Key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY is missing. Please set it in the environment variables.")
 
-# Initialize OpenAI model globally
-openai_model = ChatOpenAI(model_name="gpt-4", openai_api_key=OPENAI_API_KEY, temperature=0)
-
-# Initialize conversation memory
-#memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-
-class MemoryManager:
-    def __init__(self, max_messages=4, memory_file="memory.json"):
-        self.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-        self.max_messages = max_messages
-        self.memory_file = memory_file
-        self.session_id = str(uuid.uuid4())[:8]  # Generate a unique session ID
-        self.load_memory()
-
-    def load_memory(self):
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, 'r') as f:
-                    data = json.load(f)
-                    self.session_id = data.get('session_id', self.session_id)
-                    messages = data.get('messages', [])
-                    for msg in messages:
-                        if msg['type'] == 'human':
-                            self.memory.chat_memory.add_message(HumanMessage(content=msg['content']))
-                        else:
-                            self.memory.chat_memory.add_message(AIMessage(content=msg['content']))
-            except Exception as e:
-                print(f"Error loading memory: {e}")
+# All GPT-4 calls go through the shared client from langchain_parser (concurrency limit,
+# timeouts and retries), so a slow completion can't stall a Flask worker indefinitely
 
-    def save_memory(self):
-        try:
-            messages = []
-            for msg in self.memory.chat_memory.messages:
-                messages.append({
-                    'type': 'human' if isinstance(msg, HumanMessage) else 'ai',
-                    'content': msg.content,
-                    'timestamp': datetime.now().isoformat()
-                })
-            
-            with open(self.memory_file, 'w') as f:
-                json.dump({
-                    'session_id': self.session_id,
-                    'messages': messages,
-                    'last_updated': datetime.now().isoformat()
-                }, f)
-        except Exception as e:
-            print(f"Error saving memory: {e}")
-
-    def add_message(self, message, is_human=True):
-        # Check if we need to remove old messages
-        while len(self.memory.chat_memory.messages) >= self.max_messages:
-            self.memory.chat_memory.messages.pop(0)
-        
-        if is_human:
-            self.memory.chat_memory.add_message(HumanMessage(content=message))
-        else:
-            self.memory.chat_memory.add_message(AIMessage(content=message))
-        
-        self.save_memory()
+# Conversation history per session, appended to SQLite one message at a time
+# (replaces the memory.json file that was rewritten on every message)
+conversations = ConversationStore()
+conversations.import_json_memory("memory.json")
+SESSION_ID_RE = re.compile(r"[\w-]{1,64}")
 
-    def get_memory(self):
-        return self.memory.load_memory_variables({})["chat_history"]
+# Rolling p50/p95 of each /ask stage, served by /ask/timings
+ask_stage_stats = StageStats()
 
-    def clear_memory(self):
-        self.memory.clear()
-        self.session_id = str(uuid.uuid4())[:8]  # Generate a new session ID
-        self.save_memory()
-
-# Initialize memory manager
-memory_manager = MemoryManager()
+# Final /ask answers per session, reused until the next stored bill (no LLM or graph work on a hit)
+answer_cache = AnswerCache()
 
 def format_query_result(records, user_question):
     """Uses retrieved Neo4j records to generate a conversational answer."""
@@ -110,23 +115,18 @@ def format_query_result(records, user_question):
 
     Generate a clear and concise answer for the user.
     """
-    response = openai_model.predict(rag_prompt).strip()
+    response = llm_client.predict(rag_prompt).strip()
     return response
 
-def validate_cypher_query(query, labels, relationships, properties):
+def validate_cypher_query(query, schema):
     """Ensures Cypher query only uses valid labels, relationships, and properties."""
-    
-    for label in labels:
-        if re.search(rf"\b{label}\.", query):
-            props_in_query = re.findall(rf"{label}\.([a-zA-Z0-9_]+)", query)
-            for prop in props_in_query:
-                if prop not in properties.get(label, []):
-                    print(f"⚠️ Invalid property detected: {label}.{prop}")
-                    return False  # Query is invalid
-
-    for relationship in relationships:
-        if relationship not in query:
-            print(f"⚠️ Missing relationship: {relationship}")
+    invalid = schema.invalid_properties(query)
+    if invalid:
+        print(f"⚠️ Invalid property detected: {invalid[0]}")
+        return False  # Query is invalid
+
+    for relationship in schema.missing_relationships(query):
+        print(f"⚠️ Missing relationship: {relationship}")
 
     return True  # Query is valid
 
@@ -143,17 +143,20 @@ def get_existing_labels_and_relationships(driver):
 
         return labels, relationships, properties
 
-def generate_cypher_query(user_question, labels, relationships, properties):
-    """Generates a Cypher query based on the question and valid schema."""
-    
-    cypher_prompt = f"""
+# Schema introspection runs three procedure calls; the digest is reused until a bill is
+# stored (graph generation bump) or SCHEMA_CACHE_TTL_SECONDS passes
+schema_cache = SchemaCache(lambda: get_existing_labels_and_relationships(grocery_graph.driver))
+
+def build_cypher_prompt(user_question, schema):
+    """Builds the Cypher-generation prompt from the question and the cached schema digest."""
+    return f"""
     You are an AI assistant with access to a grocery spending knowledge graph (Neo4j).
     The user asked: "{user_question}"
 
     Use **only** these valid schema elements:
-    - **Node Labels:** {labels}
-    - **Relationships:** {relationships}
-    - **Properties for Each Label:** {json.dumps(properties, indent=2)}
+    - **Node Labels:** {schema.labels}
+    - **Relationships:** {schema.relationships}
+    - **Properties for Each Label:** {schema.properties_json}
 
     ⚠️ **Rules:**
     - **Do not use any properties that are not listed above.**
@@ -173,22 +176,36 @@ def generate_cypher_query(user_question, labels, relationships, properties):
       MATCH (u:User {{name: 'Sanjana'}})-[:BOUGHT]->(i:Item)-[:BELONGS_TO]->(c:Category)
       RETURN c.name, SUM(i.price) AS total_spent ORDER BY total_spent DESC LIMIT 1
       ```
-    - "How much did I spend on produce, bakery, and snacks?" →
+    - "How much did I spend on produce, bakery, and snacks?" (totals are precomputed per category) →
+      ```cypher
+      MATCH (s:CategorySpend {{user: 'Sanjana'}})
+      WHERE s.category IN ['produce', 'bakery', 'snacks']
+      RETURN SUM(s.total_spent) AS total_spent
+      ```
+    - "How much did I spend on dairy last month?" (each purchase is a CONTAINS edge with price, category and an indexed purchase_date; today is {datetime.now().date().isoformat()}) →
+      ```cypher
+      MATCH (b:Bill)-[r:CONTAINS]->(:Item)
+      WHERE r.purchase_date >= date('2024-05-01') AND r.purchase_date < date('2024-06-01') AND r.category = 'dairy'
+      MATCH (:User {{name: 'Sanjana'}})-[:BOUGHT]->(b)
+      RETURN SUM(r.price) AS total_spent
+      ```
+    - "How much did I spend each month?" (totals are precomputed per 'YYYY-MM' month) →
       ```cypher
-      MATCH (u:User {{name:'Sanjana'}})-[:BOUGHT]->(i:Item)-[:BELONGS_TO]->(c:Category)
-      WHERE toLower(c.name) IN ['produce', 'bakery', 'snacks']
-      RETURN SUM(i.price) AS total_spent
+      MATCH (m:MonthlySpend {{user: 'Sanjana'}})
+      RETURN m.month, m.total_spent ORDER BY m.month
       ```
     - "What item do I buy the most?" →
       ```cypher
-      MATCH (u:User {{name: 'Sanjana'}})-[r:BOUGHT]->(i:Item)
-      RETURN i.name, SUM(r.quantity) AS item_freq ORDER BY item_freq DESC LIMIT 1
+      MATCH (u:User {{name: 'Sanjana'}})-[:BOUGHT]->(i:Item)
+      RETURN i.name, i.total_frequency AS item_freq ORDER BY item_freq DESC LIMIT 1
       ```
 
     **Output only the Cypher query.**
     """
 
-    cypher_query = openai_model.predict(cypher_prompt).strip().strip("`").strip('"')
+def clean_generated_cypher(response):
+    """Strips formatting from the model output and applies the usual query fixes."""
+    cypher_query = response.strip().strip("`").strip('"')
 
     # ✅ Ensure category names are case-insensitive
     cypher_query = re.sub(r"\{name: '([^']+)'\}", r"{name: toLower('\1')}", cypher_query)
@@ -199,23 +216,38 @@ def generate_cypher_query(user_question, labels, relationships, properties):
     print(f"🔍 Generated Cypher Query:\n{cypher_query}")  # Debugging
     return cypher_query
 
+def generate_cypher_query(user_question, schema=None):
+    """Generates a Cypher query based on the question and valid schema."""
+    cypher_prompt = build_cypher_prompt(user_question, schema or schema_cache.get())
+    return clean_generated_cypher(llm_client.predict(cypher_prompt))
+
+async def agenerate_cypher_query(user_question):
+    """Gets the schema digest and generates a Cypher query; returns (cypher_query, schema)."""
+    # A fresh cached digest is used inline; only a refresh goes to a worker thread
+    schema = schema_cache.peek() or await asyncio.to_thread(schema_cache.get)
+    response = await llm_client.apredict(build_cypher_prompt(user_question, schema))
+    return clean_generated_cypher(response), schema
+
 # -------------------------
 # Helper: Execute Cypher query and return results
-def execute_cypher_query(cypher_query):
-    """Executes a Cypher query and returns the results."""
-    try:
+def execute_cypher_query(cypher_query, params=None):
+    """Executes a Cypher query (with optional parameters) and returns the results."""
+    def run():
         with grocery_graph.driver.session() as session:
-            result = session.run(cypher_query)
-            records = result.data()
-            print(f"🔍 Query Results: {records}")
-            return records if records else None
+            return session.run(cypher_query, params or {}).data()
+
+    try:
+        # Repeated read queries are answered from memory until the next stored bill
+        records = query_cache.get_or_run(cypher_query, params, run)
+        print(f"🔍 Query Results: {records}")
+        return records if records else None
     except Exception as e:
         print(f"❌ Cypher Execution Error: {str(e)}")
         return None
 
 # -------------------------
 # Helper: Check history for answer using conversation buffer
-def check_history_for_answer(user_question, past_messages):
+async def check_history_for_answer(user_question, past_messages):
     """Generates a response from past conversation history if relevant."""
     if not past_messages:
         return None
@@ -227,9 +259,14 @@ def check_history_for_answer(user_question, past_messages):
     
     Provide a concise answer using the historical data.
     """
-    response = openai_model.predict(history_prompt).strip()
+    response = (await llm_client.apredict(history_prompt)).strip()
     return response if response else None
 
+def llm_error_response(error, **extra):
+    """JSON error for an LLM call that ran out of retries (503) or time (504)."""
+    status = 504 if error.timed_out else 503
+    return jsonify({"error": f"The language model is unavailable, please try again: {error}", **extra}), status
+
 # -------------------------
 # /upload_bill endpoint 
 @app.route("/upload_bill", methods=["POST"])
@@ -238,11 +275,36 @@ def upload_bill():
         return jsonify({"error": "No file uploaded"}), 400
 
     file = request.files["file"]
-    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(file_path)
+    image_bytes = file.read()
+    image_hash = hash_image_bytes(image_bytes)
+    bill_id = bill_id_for_hash(image_hash)  # stable id: re-uploads hit the duplicate-bill check
 
-    extracted_text = extract_text_easyocr(file_path)
-    structured_data = parse_grocery_bill(extracted_text)
+    cached = bill_cache.get(image_hash)
+    if cached:
+        print(f"⚡ Returning cached results for bill {bill_id}")
+        return jsonify({"message": "Bill processed successfully!", "bill_id": bill_id,
+                        "data": cached["structured_data"], "cached": True})
+
+    file_path = os.path.join(UPLOAD_FOLDER, file.filename)
+    with open(file_path, "wb") as f:
+        f.write(image_bytes)
+
+    if OCR_ROW_MODE:
+        # Rows arrive already paired ("NAME 1.99"), so GPT-4 has little left to guess
+        cleaned_lines = rows_to_lines(extract_receipt_rows(file_path))
+        extracted_text = "\n".join(cleaned_lines)
+    else:
+        extracted_text = extract_text_easyocr(file_path)
+        cleaned_lines = clean_ocr_text(extracted_text)
+    # Clean "NAME 1.99" lines are parsed locally; only the rest goes to GPT-4
+    try:
+        if PARSER_FAST_PATH:
+            structured_data = parse_grocery_bill_fast(extracted_text, category_index,
+                                                      lines=cleaned_lines if OCR_ROW_MODE else None)
+        else:
+            structured_data = parse_grocery_bill(extracted_text)
+    except LLMCallError as e:
+        return llm_error_response(e)
     if isinstance(structured_data, dict) and "items" in structured_data:
         structured_data = structured_data["items"]
     if not isinstance(structured_data, list):
@@ -252,9 +314,37 @@ def upload_bill():
             entry["item"] = entry.pop("name")
 
     print("Final Structured Data:", structured_data)
-    bill_id = str(uuid.uuid4())[:8]
-    grocery_graph.store_grocery_data("Sanjana", structured_data, bill_id)
-    return jsonify({"message": "Bill processed successfully!", "bill_id": bill_id, "data": structured_data})
+    category_index.add_many((entry["item"], entry.get("category")) for entry in structured_data if entry.get("item"))
+
+    def cache_bill(ticket=None):
+        # Cache only after the bill is stored, so a hit always means the graph has it
+        if ticket is None or ticket.error is None:
+            bill_cache.put(image_hash, extracted_text, cleaned_lines, structured_data, bill_id)
+
+    if graph_writes is None:
+        grocery_store.store_grocery_data("Sanjana", structured_data, bill_id)
+        cache_bill()
+        persisted = True
+    else:
+        try:
+            ticket = graph_writes.submit("Sanjana", structured_data, bill_id)
+        except InvalidBill as e:
+            return jsonify({"error": str(e), "bill_id": bill_id}), 422
+        except WriteQueueFull as e:
+            return jsonify({"error": str(e)}), 503
+        ticket.add_done_callback(cache_bill)
+        persisted = False
+        # ?durable=true waits for the write, so a following /spending or /ask sees this bill
+        if request.values.get("durable", "false").lower() in ("1", "true", "yes"):
+            try:
+                persisted = ticket.wait(GRAPH_WRITE_DURABLE_TIMEOUT)
+            except Exception as e:
+                return jsonify({"error": f"Failed to store bill: {e}", "bill_id": bill_id}), 500
+            if not persisted:
+                return jsonify({"error": "Timed out waiting for the bill to be stored", "bill_id": bill_id,
+                                "queued": True}), 504
+    return jsonify({"message": "Bill processed successfully!", "bill_id": bill_id, "data": structured_data,
+                    "persisted": persisted})
 
 
 #@app.route("/spending/<category>", methods=["GET"])
@@ -264,40 +354,16 @@ def get_spending(category):
     return jsonify({"category": category, "total_spent": total_spent})
 
 
-@app.route("/ask", methods=["POST"])
-def ask_question():
-    """Handles user queries dynamically using intent classification, Neo4j, and AI."""
-    data = request.json
-    user_question = data.get("question", "").strip().lower()
-
-    if not user_question:
-        return jsonify({"error": "Question cannot be empty."}), 400
+# Spend for all categories (or ?categories=dairy,bakery) in one query
+@app.route("/spending", methods=["GET"])
+def get_spending_by_category():
+    categories = request.args.get("categories")
+    spending = query_spending_by_category(categories.split(",") if categories else None)
+    return jsonify({"spending": spending, "total_spent": sum(spending.values())})
 
-    # Add user question to memory
-    memory_manager.add_message(user_question, is_human=True)
 
-    # Fetch Schema from Neo4j **only once**
-    labels, relationships, properties = get_existing_labels_and_relationships(grocery_graph.driver)
-
-    # Generate Cypher Query Using Only Valid Schema
-    cypher_query = generate_cypher_query(user_question, labels, relationships, properties)
-
-    # Validate Query Before Execution
-    if not validate_cypher_query(cypher_query, labels, relationships, properties):
-        return jsonify({"error": "Generated query contains invalid fields. Please refine your question."}), 400
-
-    # Check Memory for Previously Asked Questions
-    past_conversations = memory_manager.get_memory()
-    print(f"🧠 Stored Memory: {past_conversations}")  # Debugging
-
-    for i, past in enumerate(past_conversations):
-        if hasattr(past, "role") and past.role == "human" and user_question in past.content.lower():
-            if i + 1 < len(past_conversations) and getattr(past_conversations[i + 1], "role", None) == "ai":
-                print("🔍 Reusing previous query intent from memory.")
-                return jsonify({"response": past_conversations[i + 1].content})
-
-    # Intent Classification using AI
-    intent_prompt = f"""
+def build_intent_prompt(user_question):
+    return f"""
     You are an AI assistant analyzing grocery spending.
     The user asked: "{user_question}"
     
@@ -309,55 +375,189 @@ def ask_question():
     
     Output only one of: "database_query", "session_data", "rag", or "ai_inference".
     """
-    intent = openai_model.predict(intent_prompt).strip().strip('"')
+
+async def classify_intent(user_question):
+    """Intent Classification using AI"""
+    intent = (await llm_client.apredict(build_intent_prompt(user_question))).strip().strip('"')
     print(f"🔍 AI Intent Prediction: {intent}")
+    return intent
+
+def _discard(task):
+    """Cancels a speculative task and swallows whatever it ends with."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def rag_answer(user_question, records, past_conversations, timings):
+    """
+    Turns query results plus conversation history into the final answer. Pass
+    `past_conversations=None` to answer from the records alone (a cacheable answer).
+    """
+    if not records:
+        return None, 200
+    # RAG: Combine DB Data + Memory Context
+    history = "" if past_conversations is None else f"""
+    Here is the past conversation history:
+    {json.dumps([msg.content for msg in past_conversations], indent=2)}
+    """
+    rag_prompt = f"""
+    The user asked: "{user_question}"
+    
+    Here is the data retrieved from the database:
+    {json.dumps(records, indent=2)}
+    {history}
+    Generate a clear, detailed, and conversational answer based on this information.
+    """
+    ai_response = (await timings.track("rag_response", llm_client.apredict(rag_prompt))).strip()
+    return {"response": ai_response}, 200
+
+async def answer_question(user_question, past_conversations, timings):
+    """
+    Runs the /ask stages as a dependency graph and returns (payload, status, cacheable).
+    Questions the intent router recognises go straight to their Cypher template.
+    Routed and database_query answers are built from the question and the graph alone
+    (no history in the prompt), so they are cacheable; rag and session_data answers
+    also read the history.
+    Cypher generation (with its schema fetch) doesn't depend on the intent, so it starts
+    alongside intent classification and is cancelled if the intent doesn't need it.
+    """
+    # Common question shapes map straight to a Cypher template: no intent or query-generation calls
+    routing_start = time.perf_counter()
+    routed = route_question(user_question, known_categories=category_index.categories()) if ASK_INTENT_ROUTER else None
+    timings.record("intent_routing", time.perf_counter() - routing_start)
+    if routed:
+        print(f"🧭 Routed to template: {routed.template.name}")
+        records = await timings.track("cypher_execution", asyncio.to_thread(execute_cypher_query, routed.cypher, routed.params))
+        return (*await rag_answer(user_question, records, None, timings), True)
+
+    cypher_task = asyncio.create_task(timings.track("cypher_generation", agenerate_cypher_query(user_question)))
+    try:
+        intent = await timings.track("intent_classification", classify_intent(user_question))
+    except Exception:
+        _discard(cypher_task)
+        raise
 
     if intent in ["database_query", "rag"]:
-        records = execute_cypher_query(cypher_query)
-        if records:
-            # RAG: Combine DB Data + Memory Context
-            rag_prompt = f"""
-            The user asked: "{user_question}"
-            
-            Here is the data retrieved from the database:
-            {json.dumps(records, indent=2)}
-            
-            Here is the past conversation history:
-            {json.dumps([msg.content for msg in past_conversations], indent=2)}
-            
-            Generate a clear, detailed, and conversational answer based on this information.
-            """
-            ai_response = openai_model.predict(rag_prompt).strip()
-            memory_manager.add_message(ai_response, is_human=False)
-            return jsonify({"response": ai_response})
-
-    elif intent == "session_data":
-        history_response = check_history_for_answer(user_question, past_conversations)
+        cypher_query, schema = await cypher_task
+
+        # Validate Query Before Execution
+        if not validate_cypher_query(cypher_query, schema):
+            return {"error": "Generated query contains invalid fields. Please refine your question."}, 400, False
+
+        records = await timings.track("cypher_execution", asyncio.to_thread(execute_cypher_query, cypher_query))
+        cacheable = intent == "database_query"
+        history = None if cacheable else past_conversations
+        return (*await rag_answer(user_question, records, history, timings), cacheable)
+
+    _discard(cypher_task)
+
+    if intent == "session_data":
+        history_response = await timings.track("history_response", check_history_for_answer(user_question, past_conversations))
         if history_response:
-            memory_manager.add_message(history_response, is_human=False)
-            return jsonify({"response": history_response})
+            return {"response": history_response}, 200, False
 
     elif intent == "ai_inference":
         ai_fallback_prompt = f"""
         The user asked: "{user_question}"
         Generate an answer based solely on general grocery spending knowledge.
         """
-        fallback_response = openai_model.predict(ai_fallback_prompt).strip()
-        memory_manager.add_message(fallback_response, is_human=False)
-        return jsonify({"response": fallback_response})
-    
-    return jsonify({"response": "I'm not sure how to answer that. Could you clarify?"})
+        fallback_response = (await timings.track("fallback_response", llm_client.apredict(ai_fallback_prompt))).strip()
+        return {"response": fallback_response}, 200, False
+
+    return None, 200, False
+
+
+@app.route("/ask", methods=["POST"])
+def ask_question():
+    """Handles user queries dynamically using intent classification, Neo4j, and AI."""
+    data = request.json
+    user_question = data.get("question", "").strip().lower()
+
+    if not user_question:
+        return jsonify({"error": "Question cannot be empty."}), 400
+    if grocery_graph is None:
+        return jsonify({"error": "Questions need the Neo4j backend (GROCERY_STORE_BACKEND=neo4j)."}), 501
+
+    session_id = str(data.get("session_id") or DEFAULT_SESSION_ID)
+    if not SESSION_ID_RE.fullmatch(session_id):
+        return jsonify({"error": "Invalid session_id."}), 400
 
+    timings = StageTimings()
 
-# Endpoint to check conversation memory
+    # Same question, same session, graph unchanged: answer from the cache before any LLM or graph work
+    lookup_start = time.perf_counter()
+    cached = answer_cache.get(session_id, user_question)
+    timings.record("answer_cache", time.perf_counter() - lookup_start)
+    if cached:
+        print("🔍 Reusing cached answer.")
+        conversations.add_messages(session_id, ("human", user_question), ("ai", cached["response"]))
+        ask_stage_stats.add(timings)
+        return jsonify({**cached, "cached": True, "session_id": session_id})
+
+    # Add user question to memory
+    conversations.add_message(session_id, user_question, is_human=True)
+    past_conversations = conversations.get_messages(session_id)
+    print(f"🧠 Stored Memory: {past_conversations}")  # Debugging
+
+    # The pipeline runs on the LLM client's event loop so independent calls overlap
+    generation = graph_generation.current()
+    try:
+        payload, status, cacheable = llm_client.run(answer_question(user_question, past_conversations, timings))
+    except LLMCallError as e:
+        ask_stage_stats.add(timings)
+        return llm_error_response(e, session_id=session_id)
+
+    ask_stage_stats.add(timings)
+    print(f"⏱️ /ask stage timings (ms): {timings.as_dict()}")
+
+    if payload is None:
+        return jsonify({"response": "I'm not sure how to answer that. Could you clarify?", "session_id": session_id})
+    if "response" in payload:
+        conversations.add_message(session_id, payload["response"], is_human=False)
+        if status == 200 and cacheable:
+            answer_cache.put(session_id, user_question, payload, generation)
+    return jsonify({**payload, "session_id": session_id}), status
+
+
+# Endpoint to check conversation memory (?session_id=..., loaded on first use)
 @app.route("/memory", methods=["GET"])
 def get_memory():
-    memory_data = memory_manager.get_memory()
+    session_id = request.args.get("session_id") or DEFAULT_SESSION_ID
+    if not SESSION_ID_RE.fullmatch(session_id):
+        return jsonify({"error": "Invalid session_id."}), 400
+    memory_data = conversations.get_messages(session_id)
     return jsonify({
         "chat_history": [msg.content for msg in memory_data],
-        "session_id": memory_manager.session_id,
+        "session_id": session_id,
         "message_count": len(memory_data)
     })
 
+@app.route("/memory/clear", methods=["POST"])
+def clear_memory():
+    session_id = str((request.get_json(silent=True) or {}).get("session_id") or DEFAULT_SESSION_ID)
+    if not SESSION_ID_RE.fullmatch(session_id):
+        return jsonify({"error": "Invalid session_id."}), 400
+    conversations.clear(session_id)
+    answer_cache.clear_session(session_id)
+    return jsonify({"message": "Conversation history cleared.", "session_id": session_id})
+
+# Endpoint to check /ask latency per pipeline stage
+@app.route("/ask/timings", methods=["GET"])
+def get_ask_timings():
+    return jsonify(ask_stage_stats.summary())
+
+# Endpoint to check cache effectiveness
+@app.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    return jsonify({
+        "llm": get_llm_cache().stats(),
+        "llm_client": llm_client.stats(),
+        "schema": schema_cache.stats(),
+        "query_results": query_cache.stats(),
+        "answers": answer_cache.stats(),
+        "conversations": conversations.stats(),
+        "graph_writes": graph_writes.stats() if graph_writes else None,
+    })
+
 if __name__ == "__main__":
+    startup()  # fail fast on a missing database instead of on the first request
     app.run(debug=True)
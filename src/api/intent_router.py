@@ -0,0 +1,330 @@
+import os
+import re
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+# Load intent router settings
+load_dotenv()
+ASK_INTENT_ROUTER = os.getenv("ASK_INTENT_ROUTER", "true").lower() in ("1", "true", "yes")
+DEFAULT_USER = "Sanjana"
+
+# Questions the templates can't answer correctly (time ranges, past conversation,
+# comparisons, advice) always go to GPT-4
+UNSUPPORTED_RE = re.compile(
+    r"\b(last|this|next|past|previous|since|between|before|after|ago|yesterday|today|week|month|year|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december|"
+    r"asked|said|told|earlier|remember|conversation|"
+    r"why|should|recommend|suggest|compare|versus|vs|than|average|budget|save|cheaper)\b"
+)
+
+MONTH_NAMES = ["january", "february", "march", "april", "may", "june", "july", "august", "september",
+               "october", "november", "december"]
+RELATIVE_RANGE_RE = re.compile(r"\b(?:in\s+|during\s+|over\s+|for\s+)?(?:the\s+)?(last|previous|past|this)\s+(week|month|year)\b"
+                               r"|\b(yesterday|today)\b")
+MONTH_RANGE_RE = re.compile(rf"\b(?:in|during|for)\s+({'|'.join(MONTH_NAMES)})(?:\s+(\d{{4}}))?\b")
+
+SPEND = r"(?:spend|spent|spending|pay|paid)"
+TOP_N = r"(?:top\s+(?P<limit>\d{1,2})\s+)?"
+
+# Words that mean "everything", so "how much did I spend on groceries" is a plain total
+ALL_CATEGORIES = {"grocery", "groceries", "everything", "food", "all", "total", "all categories", "it"}
+CATEGORY_SPLIT_RE = re.compile(r"\s*(?:,|&|\band\b|\bor\b|\bplus\b)\s*")
+CATEGORY_FILLER_RE = re.compile(r"^(?:my|the|all|on|for)\s+|\s+(?:items?|products?|stuff|category|categories|in total|overall|altogether)$")
+
+
+# "...item in dairy", "...from the bakery": a qualifier the global item templates can't apply
+ITEM_QUALIFIER_RE = re.compile(r"\b(?:in|from|among|within|under)\s+(?:the\s+|my\s+)?[a-z]")
+# Counts, stores, rates and taxes: none of the fixed templates has a parameter for them
+EXTRA_QUALIFIER_RE = re.compile(r"\b(?:once|twice|thrice|times|at|per|each|every|tax|taxes|fees?|with|without|"
+                                r"except|excluding|only)\b")
+# "how much did i spend on groceries in total" is still the grand total...
+TOTAL_FILLER_RE = re.compile(rf"\b(?:on|for)\s+(?:my\s+|the\s+)?(?:{'|'.join(sorted(ALL_CATEGORIES, key=len, reverse=True))})\b"
+                             r"|\b(?:in total|so far|overall|altogether)\b")
+# ...but "the total cost of dairy" or "spend on milk" is not
+TOTAL_QUALIFIER_RE = re.compile(r"\b(?:of|on|for|in|from)\b")
+ITEM_WORD_RE = re.compile(r"\b(?:items?|products?|things?)\b")
+
+
+class CypherTemplate:
+    """
+    A question shape the router answers with a fixed, parameterised Cypher query.
+    `params(match, known_categories)` builds the query parameters. `ranged_cypher`
+    answers the same shape over a date range ($start, $end), for templates that can;
+    the others decline questions with a time phrase.
+    """
+
+    def __init__(self, name, pattern, cypher, params=None, ranged_cypher=None):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.cypher = cypher
+        self.params = params or (lambda match, known_categories: {})
+        self.ranged_cypher = ranged_cypher
+
+
+class RoutedQuery:
+    def __init__(self, template, params, cypher=None):
+        self.template = template
+        self.cypher = cypher or template.cypher
+        self.params = params
+
+    def __repr__(self):
+        return f"RoutedQuery({self.template.name}, {self.params})"
+
+
+def parse_categories(text):
+    """'produce, bakery and snacks' -> ['produce', 'produces', 'bakery', ...]; None if it doesn't look like categories."""
+    categories = []
+    for part in CATEGORY_SPLIT_RE.split(text.strip(" ?.!")):
+        previous = None
+        while part != previous:  # strip stacked fillers ("all my dairy items")
+            previous, part = part, CATEGORY_FILLER_RE.sub("", part).strip()
+        if not part:
+            continue
+        if len(part.split()) > 3 or not re.fullmatch(r"[a-z][a-z &'-]*", part):
+            return None
+        categories.append(part)
+    return categories or None
+
+
+def _month_start(day, months_back=0):
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def parse_time_range(question, today=None):
+    """
+    Finds a time phrase ('last month', 'this week', 'in september', 'yesterday', ...).
+    Returns (start, end, question without the phrase) with [start, end) as dates, or
+    None. 'last' means the previous calendar period, 'past' a rolling window.
+    """
+    today = today or date.today()
+    tomorrow = today + timedelta(days=1)
+    match = RELATIVE_RANGE_RE.search(question)
+    if match:
+        which, unit, day_word = match.groups()
+        if day_word == "today":
+            start, end = today, tomorrow
+        elif day_word == "yesterday":
+            start, end = today - timedelta(days=1), today
+        elif unit == "week":
+            monday = today - timedelta(days=today.weekday())
+            start, end = {"this": (monday, tomorrow), "past": (today - timedelta(days=6), tomorrow)}.get(
+                which, (monday - timedelta(days=7), monday))
+        elif unit == "month":
+            start, end = {"this": (_month_start(today), tomorrow), "past": (today - timedelta(days=29), tomorrow)}.get(
+                which, (_month_start(today, 1), _month_start(today)))
+        else:
+            start, end = {"this": (date(today.year, 1, 1), tomorrow), "past": (today - timedelta(days=364), tomorrow)}.get(
+                which, (date(today.year - 1, 1, 1), date(today.year, 1, 1)))
+    else:
+        match = MONTH_RANGE_RE.search(question)
+        if not match:
+            return None
+        month = MONTH_NAMES.index(match.group(1)) + 1
+        # Without a year, the most recent such month (this one included)
+        year = int(match.group(2)) if match.group(2) else today.year - (month > today.month)
+        start = date(year, month, 1)
+        end = _month_start(date(year, month, 28) + timedelta(days=4))
+
+    remaining = " ".join((question[:match.start()] + " " + question[match.end():]).split())
+    return start, end, remaining
+
+
+def category_variants(category):
+    """'fruit' -> ('fruit', 'fruits'), 'fruits' -> ('fruits', 'fruit')."""
+    return category, category[:-1] if category.endswith("s") else category + "s"
+
+
+def known_category(name, known_categories):
+    """The stored (lowercased) category `name` refers to, allowing for a plural 's'; None if unknown."""
+    for variant in category_variants(name):
+        if variant in known_categories:
+            return variant
+    return None
+
+
+def mentions_category(question, known_categories):
+    """True when the question names any known category ('cheapest dairy product')."""
+    return any(re.search(rf"\b{re.escape(variant)}\b", question)
+               for category in known_categories for variant in category_variants(category))
+
+
+# Returned by a params function to stop routing (None only skips to the next template)
+DECLINE = object()
+
+
+def _item_params(match, known_categories):
+    # The item templates rank every item once; a category- or count-qualified question needs GPT-4
+    question = match.string
+    if ITEM_QUALIFIER_RE.search(question) or EXTRA_QUALIFIER_RE.search(question) \
+            or mentions_category(question, known_categories or ()):
+        return DECLINE
+    return {"limit": int(match.group("limit") or 1)}
+
+
+def _total_params(match, known_categories):
+    # The total covers every bill and category; anything narrowing it needs GPT-4
+    question = match.string
+    if EXTRA_QUALIFIER_RE.search(question) or mentions_category(question, known_categories or ()):
+        return DECLINE
+    if TOTAL_QUALIFIER_RE.search(TOTAL_FILLER_RE.sub("", question)):
+        return DECLINE
+    return {}
+
+
+def _top_category_params(match, known_categories):
+    # "which item did i spend the most on" asks for an item, not a category
+    question = match.string
+    if ITEM_WORD_RE.search(question) or EXTRA_QUALIFIER_RE.search(question):
+        return DECLINE
+    return {"limit": 1}
+
+
+def _category_params(match, known_categories):
+    categories = parse_categories(match.group("categories"))
+    if categories is None:
+        return DECLINE
+    if any(category in ALL_CATEGORIES for category in categories):
+        return None  # "spend on groceries" is a plain total; let total_spend take it
+    # "spend on milk" names an item, not a category: only route when every name is a known category
+    resolved = [known_category(category, known_categories or ()) for category in categories]
+    if None in resolved:
+        return DECLINE
+    return {"categories": list(dict.fromkeys(resolved))}
+
+
+# Spend per category over [$start, $end), through the CONTAINS purchase_date range index
+RANGED_SPEND_BY_CATEGORY = """
+        MATCH (b:Bill)-[r:CONTAINS]->(:Item)
+        USING INDEX r:CONTAINS(purchase_date)
+        WHERE r.purchase_date >= date($start) AND r.purchase_date < date($end)
+          AND ($categories IS NULL OR r.category IN $categories)
+        MATCH (:User {name: $user})-[:BOUGHT]->(b)
+        RETURN r.category AS category, SUM(r.price) AS total_spent
+        ORDER BY total_spent DESC
+        """
+
+# Order matters: the first template whose pattern matches (and whose params aren't None) wins
+TEMPLATES = [
+    CypherTemplate(
+        "spend_by_category",
+        rf"\b(?:{SPEND}|money)\b.*\b(?:by|per|each|every|for each)\s+categor|\bcategory\s+(?:breakdown|wise)\b|\bbreakdown\b",
+        """
+        MATCH (s:CategorySpend {user: $user})
+        RETURN s.category AS category, s.total_spent AS total_spent
+        ORDER BY total_spent DESC
+        """,
+        ranged_cypher=RANGED_SPEND_BY_CATEGORY,
+    ),
+    CypherTemplate(
+        "top_category",
+        rf"\b(?:which|what)\b.*\b(?:{SPEND}|money)\b.*\b(?:the\s+)?most\b|\b(?:biggest|largest|top|most expensive)\s+categor"
+        rf"|\bcategor(?:y|ies)\b.*\b(?:{SPEND}|cost)\w*\b.*\bmost\b|\bwhere\b.*\b{SPEND}\b.*\bmost\b",
+        """
+        MATCH (s:CategorySpend {user: $user})
+        RETURN s.category AS category, s.total_spent AS total_spent
+        ORDER BY total_spent DESC LIMIT $limit
+        """,
+        _top_category_params,
+        ranged_cypher=RANGED_SPEND_BY_CATEGORY + "LIMIT $limit\n",
+    ),
+    CypherTemplate(
+        "category_spend",
+        rf"\b{SPEND}\b(?:\s+(?:in total|altogether|so far|overall))?\s+(?:on|for)\s+(?P<categories>[^?]+)",
+        # One row per asked category: a known category with no purchases is $0, not "no data"
+        """
+        UNWIND $categories AS category
+        OPTIONAL MATCH (s:CategorySpend {key: $user + '|' + category})
+        RETURN category, coalesce(s.total_spent, 0) AS total_spent
+        ORDER BY total_spent DESC
+        """,
+        _category_params,
+        ranged_cypher="""
+        UNWIND $categories AS category
+        OPTIONAL MATCH (:User {name: $user})-[:BOUGHT]->(b:Bill)-[r:CONTAINS]->(:Item)
+        USING INDEX r:CONTAINS(purchase_date)
+        WHERE r.purchase_date >= date($start) AND r.purchase_date < date($end) AND r.category = category
+        RETURN category, coalesce(SUM(r.price), 0) AS total_spent
+        ORDER BY total_spent DESC
+        """,
+    ),
+    CypherTemplate(
+        "total_spend",
+        rf"^(?!.*categor)(?:.*\bhow much\b.*\b{SPEND}\b|.*\btotal\s+(?:{SPEND}|spend|cost|bill)\b|what (?:did|have) i {SPEND}\??$)",
+        """
+        MATCH (s:CategorySpend {user: $user})
+        RETURN SUM(s.total_spent) AS total_spent
+        """,
+        _total_params,
+        ranged_cypher="""
+        MATCH (b:Bill)-[r:CONTAINS]->(:Item)
+        USING INDEX r:CONTAINS(purchase_date)
+        WHERE r.purchase_date >= date($start) AND r.purchase_date < date($end)
+        MATCH (:User {name: $user})-[:BOUGHT]->(b)
+        RETURN SUM(r.price) AS total_spent
+        """,
+    ),
+    CypherTemplate(
+        "most_expensive_item",
+        rf"^(?!.*categor).*?\b{TOP_N}(?:most expensive|priciest|costliest|highest[- ]priced?)\b",
+        """
+        MATCH (u:User {name: $user})-[:BOUGHT]->(i:Item)
+        RETURN i.name AS item, i.price AS price
+        ORDER BY i.price DESC LIMIT $limit
+        """,
+        _item_params,
+    ),
+    CypherTemplate(
+        "cheapest_item",
+        rf"^(?!.*categor).*?\b{TOP_N}(?:cheapest|least expensive|lowest[- ]priced?)\b",
+        """
+        MATCH (u:User {name: $user})-[:BOUGHT]->(i:Item)
+        RETURN i.name AS item, i.price AS price
+        ORDER BY i.price ASC LIMIT $limit
+        """,
+        _item_params,
+    ),
+    CypherTemplate(
+        "most_frequent_item",
+        rf"^(?!.*categor).*?\b{TOP_N}(?:(?:buy|bought|purchase[ds]?|get)\b.*\bmost(?:\s+(?:often|frequently))?\b"
+        rf"|most\s+(?:often|frequently|commonly)?\s*(?:bought|purchased)\b|favou?rite\s+items?\b)",
+        """
+        MATCH (u:User {name: $user})-[:BOUGHT]->(i:Item)
+        RETURN i.name AS item, i.total_frequency AS times_bought
+        ORDER BY times_bought DESC LIMIT $limit
+        """,
+        _item_params,
+    ),
+]
+
+
+def route_question(question, user=DEFAULT_USER, today=None, known_categories=None):
+    """
+    Matches a lowercased question against the template library. Returns a RoutedQuery
+    (Cypher + params) for known shapes, or None when GPT-4 should handle it. A time
+    phrase ('last month') switches spend templates to their date-range query.
+    `known_categories` (lowercased names, e.g. CategoryIndex.categories()) decides
+    which names are categories; without it, category questions go to GPT-4.
+    """
+    question = " ".join(question.lower().split())
+    time_range = parse_time_range(question, today)
+    if time_range:
+        start, end, question = time_range
+    if UNSUPPORTED_RE.search(question):
+        return None
+    for template in TEMPLATES:
+        match = template.pattern.search(question)
+        if not match:
+            continue
+        params = template.params(match, known_categories)
+        if params is DECLINE:
+            return None
+        if params is None:
+            continue
+        if time_range:
+            if template.ranged_cypher is None:
+                return None
+            ranged_params = {"categories": None, **params, "start": start.isoformat(), "end": end.isoformat()}
+            return RoutedQuery(template, {"user": user, **ranged_params}, template.ranged_cypher)
+        return RoutedQuery(template, {"user": user, **params})
+    return None
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class StageTimings:
+    """Wall-clock duration of each stage of one request, in milliseconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    async def track(self, name, awaitable):
+        """Awaits `awaitable` and records how long it took under `name`."""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def record(self, name, seconds):
+        self.stages[name] = round(seconds * 1000, 1)
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def as_dict(self):
+        return {**self.stages, "total": self.total_ms()}
+
+
+class StageStats:
+    """Rolling per-stage latency percentiles over the most recent requests."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def add(self, timings):
+        with self._lock:
+            for name, ms in timings.as_dict().items():
+                self._samples[name].append(ms)
+
+    def summary(self):
+        summary = {}
+        with self._lock:
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                summary[name] = {
+                    "count": len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                }
+        return summary
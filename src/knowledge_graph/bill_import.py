@@ -0,0 +1,206 @@
+"""
+Streaming import of already-parsed bills from a JSONL archive.
+
+One bill per line, items in the shape parse_grocery_bill returns:
+
+    {"bill_id": "b-001", "user": "Sanjana", "purchased_at": "2024-03-02T10:15:00",
+     "items": [{"item": "milk", "quantity": "1 gal", "price": "3.49", "category": "Dairy"}]}
+
+`user` defaults to --user and `purchased_at` to the import time; a line without
+`bill_id` gets one from a hash of its bytes, so re-importing the file stays
+idempotent. A bare JSON list of items is read as a bill with only those defaults.
+Invalid lines are counted, reported (or written to --rejects) and skipped.
+
+Bills are written with store_bills, --batch-size bills per transaction, so the spend
+aggregates stay current. The file is read line by line and only one batch is held
+in memory. After every batch the byte offset is saved to a checkpoint file, and
+--resume continues from it:
+
+    python -m src.knowledge_graph.bill_import bills.jsonl --batch-size 500
+    python -m src.knowledge_graph.bill_import bills.jsonl --resume
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from src.knowledge_graph.grocery_store import GROCERY_STORE_BACKEND, GROCERY_SQLITE_PATH, STORE_BATCH_BILLS, \
+    InvalidBill, create_store, extract_numeric_quantity, purchase_time
+
+PROGRESS_EVERY_SECONDS = 5
+
+
+def _price(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip().lstrip("$").replace(",", ""))
+    except ValueError:
+        raise InvalidBill(f"price {value!r} is not a number") from None
+
+
+def normalize_bill(record, raw_line, default_user):
+    """One JSONL record as a store_bills bill, with numeric prices and quantities. Raises InvalidBill."""
+    if isinstance(record, list):
+        record = {"items": record}
+    if not isinstance(record, dict):
+        raise InvalidBill("expected a JSON object or a list of items")
+    items = record.get("items", record.get("purchases"))
+    if not isinstance(items, list) or not items:
+        raise InvalidBill("no items")
+
+    purchases = []
+    for position, entry in enumerate(items):
+        if not isinstance(entry, dict):
+            raise InvalidBill(f"item {position} is not an object")
+        name = entry.get("item", entry.get("name"))
+        if not isinstance(name, str) or not name.strip():
+            raise InvalidBill(f"item {position} has no name")
+        category = entry.get("category") or "Uncategorized"
+        if not isinstance(category, str):
+            raise InvalidBill(f"item {position} has a non-text category {category!r}")
+        purchases.append({
+            "item": name.strip(),
+            "category": category,
+            "price": _price(entry.get("price", 0)),
+            "quantity": extract_numeric_quantity(entry.get("quantity", "1")),
+        })
+
+    purchased_at = record.get("purchased_at")
+    if purchased_at is not None:
+        if not isinstance(purchased_at, str):
+            raise InvalidBill(f"purchased_at {purchased_at!r} is not an ISO date string")
+        try:
+            purchase_time(purchased_at)
+        except (TypeError, ValueError):
+            raise InvalidBill(f"purchased_at {purchased_at!r} is not an ISO date") from None
+    user = record.get("user") or default_user
+    if not isinstance(user, str):
+        raise InvalidBill(f"user {user!r} is not text")
+    bill_id = record.get("bill_id") or hashlib.sha256(raw_line.strip()).hexdigest()[:16]
+    if not isinstance(bill_id, (str, int)) or isinstance(bill_id, bool):
+        raise InvalidBill(f"bill_id {bill_id!r} is not a string or number")
+    return {"user": user, "bill_id": str(bill_id),
+            "purchases": purchases, "purchased_at": purchased_at}
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    """Written to a temp file and renamed, so a crash never leaves a torn checkpoint."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def import_bills(store, path, batch_size=STORE_BATCH_BILLS, user="Sanjana", checkpoint_path=None,
+                 resume=False, rejects=None):
+    """
+    Imports every bill in `path` through `store.store_bills` and returns the counters.
+    With `checkpoint_path`, progress is saved after each batch; `resume` starts from it.
+    """
+    state = {"offset": 0, "lines": 0, "stored": 0, "duplicates": 0, "rejected": 0, "items": 0}
+    if resume and checkpoint_path:
+        saved = load_checkpoint(checkpoint_path)
+        if saved:
+            state.update(saved)
+            print(f"↪️ Resuming at line {state['lines']} (byte {state['offset']})")
+
+    file_size = os.path.getsize(path)
+    if state["offset"] > file_size:
+        raise ValueError(f"Checkpoint offset {state['offset']} is past the end of {path}; was the file replaced?")
+
+    started = time.perf_counter()
+    session_bytes = session_items = 0
+    last_report = started
+    batch, batch_items = [], 0
+
+    def write_batch(offset):
+        nonlocal batch, batch_items, session_items
+        stored = store.store_bills(batch, batch_size=len(batch))
+        state["stored"] += len(stored)
+        state["duplicates"] += len(batch) - len(stored)
+        state["items"] += batch_items
+        state["offset"] = offset
+        session_items += batch_items
+        batch, batch_items = [], 0
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, state)
+
+    def report(final=False):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(f"{'✅ Done' if final else '⏳'} {state['lines']} lines ({state['offset'] / max(file_size, 1):.1%}), "
+              f"{state['stored']} stored, {state['duplicates']} duplicates, {state['rejected']} rejected | "
+              f"{session_items / elapsed:.0f} items/s, {session_bytes / elapsed / 1e6:.1f} MB/s")
+
+    # Binary mode: offsets are exact byte positions, whatever the encoding
+    with open(path, "rb") as f:
+        f.seek(state["offset"])
+        offset = state["offset"]
+        for raw_line in f:
+            offset += len(raw_line)
+            session_bytes += len(raw_line)
+            state["lines"] += 1
+            if not raw_line.strip():
+                continue
+            try:
+                bill = normalize_bill(json.loads(raw_line), raw_line, user)
+            except (ValueError, InvalidBill) as e:  # JSONDecodeError and UnicodeDecodeError are ValueErrors
+                state["rejected"] += 1
+                if rejects:
+                    rejects.write(json.dumps({"line": state["lines"], "error": str(e)}) + "\n")
+                else:
+                    print(f"⚠️ Line {state['lines']} skipped: {e}")
+                continue
+            batch.append(bill)
+            batch_items += len(bill["purchases"])
+            if len(batch) >= batch_size:
+                write_batch(offset)
+                if time.perf_counter() - last_report >= PROGRESS_EVERY_SECONDS:
+                    report()
+                    last_report = time.perf_counter()
+        if batch:
+            write_batch(offset)
+        elif checkpoint_path:
+            state["offset"] = offset
+            save_checkpoint(checkpoint_path, state)
+    report(final=True)
+    return state
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("path", help="JSONL file, one bill per line")
+    arg_parser.add_argument("--batch-size", type=int, default=STORE_BATCH_BILLS, help="bills per transaction")
+    arg_parser.add_argument("--user", default="Sanjana", help="owner of bills without a user field")
+    arg_parser.add_argument("--backend", default=GROCERY_STORE_BACKEND, help="neo4j or sqlite")
+    arg_parser.add_argument("--sqlite-path", default=GROCERY_SQLITE_PATH)
+    arg_parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.checkpoint)")
+    arg_parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    arg_parser.add_argument("--rejects", help="write skipped lines' numbers and errors here (JSONL)")
+    args = arg_parser.parse_args()
+
+    store = create_store(args.backend, sqlite_path=args.sqlite_path)
+    rejects = open(args.rejects, "a") if args.rejects else None
+    try:
+        store.migrate_schema()
+        state = import_bills(store, args.path, batch_size=args.batch_size, user=args.user,
+                             checkpoint_path=args.checkpoint or args.path + ".checkpoint",
+                             resume=args.resume, rejects=rejects)
+    finally:
+        if rejects:
+            rejects.close()
+        store.close()
+    return 1 if state["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_item_name(name):
+    """Lowercases, drops punctuation and crude plural endings ('Bananas' -> 'banana')."""
+    tokens = NON_ALNUM_RE.sub(" ", name.lower()).split()
+    return " ".join(token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+                    for token in tokens)
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _is_word(token):
+    """Tokens worth indexing: sizes, SKUs and prices say nothing about the category."""
+    return len(token) >= 3 and any(ch.isalpha() for ch in token)
+
+
+class CategoryIndex:
+    """
+    Item name -> category lookups. Known names are a single dict lookup. Other names
+    are scored token by token: each indexed token keeps a count of the categories it
+    appears under, and OCR-mangled tokens are mapped to the closest indexed token via
+    a trigram index over the token vocabulary. Lookup cost depends on the number of
+    tokens in the query, not on how many items are indexed: trigrams shared by more than
+    `max_gram_tokens` tokens are left out of the fuzzy match.
+    """
+
+    def __init__(self, min_similarity=0.6, min_margin=1.5, max_gram_tokens=300):
+        self.min_similarity = min_similarity  # Dice similarity needed to correct a token
+        self.min_margin = min_margin  # winning category score vs. the runner-up
+        self.max_gram_tokens = max_gram_tokens  # trigrams shared by more tokens are skipped in fuzzy matching
+        self._lock = threading.Lock()
+        self._exact = {}  # normalized name -> category
+        self._category_names = {}  # lowercased category -> first spelling seen ("dairy" -> "Dairy")
+        self._token_categories = defaultdict(Counter)  # token -> {category: names containing it}
+        self._trigram_tokens = defaultdict(set)  # trigram -> tokens containing it
+
+    def __len__(self):
+        return len(self._exact)
+
+    def add(self, item_name, category):
+        """Records (or updates) the category of an item."""
+        normalized = normalize_item_name(item_name)
+        if not normalized or not category or not category.strip():
+            return
+        with self._lock:
+            category = self._category_names.setdefault(category.strip().lower(), category.strip())
+            previous = self._exact.get(normalized)
+            if previous == category:
+                return
+            for token in set(normalized.split()):
+                if not _is_word(token):
+                    continue
+                counts = self._token_categories[token]
+                if not counts:
+                    for gram in trigrams(token):
+                        self._trigram_tokens[gram].add(token)
+                if previous:
+                    counts[previous] -= 1
+                    if counts[previous] <= 0:
+                        del counts[previous]
+                counts[category] += 1
+            self._exact[normalized] = category
+
+    def categories(self):
+        """Every category seen so far, lowercased (as stored on purchases and spend aggregates)."""
+        with self._lock:
+            return set(self._category_names)
+
+    def add_many(self, pairs):
+        for item_name, category in pairs:
+            self.add(item_name, category)
+
+    def _match_token(self, token):
+        """The indexed token itself, or the most similar one (for OCR typos), or None. Caller holds the lock."""
+        if self._token_categories.get(token):
+            return token
+        grams = trigrams(token)
+        shared = Counter()
+        for gram in grams:
+            candidates = self._trigram_tokens.get(gram, ())
+            # Common grams (" co", "ing") would cost a pass over thousands of tokens and barely
+            # narrow the match; the token's rarer grams still find its neighbours
+            if len(candidates) <= self.max_gram_tokens:
+                shared.update(candidates)
+
+        best_token, best_score = None, 0.0
+        for candidate, _ in shared.most_common(10):
+            candidate_grams = trigrams(candidate)  # full overlap, skipped grams included
+            score = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+            if score > best_score:
+                best_token, best_score = candidate, score
+        return best_token if best_score >= self.min_similarity else None
+
+    def lookup(self, item_name):
+        """Returns the category for an item name, or None if nothing similar is known."""
+        normalized = normalize_item_name(item_name)
+        if not normalized:
+            return None
+        with self._lock:  # add() may be updating the token and trigram indexes from another request
+            return self._lookup(normalized)
+
+    def _lookup(self, normalized):
+        category = self._exact.get(normalized)
+        if category is not None:
+            return category
+
+        # Rare tokens ("yogurt") outweigh common ones ("organic"); each token spreads its
+        # weight over the categories it has been seen under
+        scores = Counter()
+        total_names = len(self._exact)
+        for token in set(normalized.split()):
+            if not _is_word(token):
+                continue
+            match = self._match_token(token)
+            if match is None:
+                continue
+            counts = self._token_categories[match]
+            frequency = sum(counts.values())
+            weight = math.log(1 + total_names / frequency)
+            for category, count in counts.items():
+                scores[category] += weight * count / frequency
+
+        if not scores:
+            return None
+        ranked = scores.most_common(2)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0] if ranked[0][1] >= self.min_margin * runner_up else None
+
+    def resolve(self, item_names, categorize_batch=None):
+        """
+        Maps item names to categories. Names the index doesn't know are sent to
+        `categorize_batch` (one call for all of them) and learned for next time.
+        """
+        resolved, unseen = {}, []
+        for name in item_names:
+            category = self.lookup(name)
+            if category:
+                resolved[name] = category
+            elif name not in unseen:
+                unseen.append(name)
+
+        if unseen and categorize_batch:
+            for name, category in categorize_batch(unseen).items():
+                if category:
+                    self.add(name, category)
+                    resolved[name] = category
+        return resolved
+
+    @classmethod
+    def from_mapping(cls, mapping, **kwargs):
+        """Index seeded from a keyword -> category dict such as CATEGORY_MAPPING."""
+        index = cls(**kwargs)
+        index.add_many(mapping.items())
+        return index
+
+    @classmethod
+    def from_store(cls, store, seed_mapping=None, **kwargs):
+        """Index learned from the item categories already in a GroceryStore (Neo4j or SQLite)."""
+        index = cls.from_mapping(seed_mapping or {}, **kwargs)
+        index.add_many(store.item_categories())
+        return index
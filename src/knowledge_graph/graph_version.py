@@ -0,0 +1,25 @@
+import threading
+
+
+class GraphGeneration:
+    """
+    Process-wide counter bumped after every committed write to the grocery graph.
+    Caches of graph-derived data (schema, query results, answers) store the
+    generation they were built at and treat a different current value as stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def current(self):
+        return self._value
+
+    def bump(self):
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+# Shared by GroceryGraph (writer) and every cache that reads the graph
+graph_generation = GraphGeneration()
@@ -0,0 +1,168 @@
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+from src.knowledge_graph.graph_version import graph_generation
+
+# Load storage settings
+load_dotenv()
+GROCERY_STORE_BACKEND = os.getenv("GROCERY_STORE_BACKEND", "neo4j")  # "sqlite" runs without a Neo4j server
+GROCERY_SQLITE_PATH = os.getenv("GROCERY_SQLITE_PATH", "cache/grocery.sqlite3")
+STORE_BATCH_BILLS = int(os.getenv("STORE_BATCH_BILLS", "200"))  # bills per write transaction in store_bills
+
+def extract_numeric_quantity(quantity):
+    """Extracts numeric values from quantity (e.g., '1.05 lb' -> 1.05, '2 pcs' -> 2)"""
+    match = re.search(r"\d+(\.\d+)?", str(quantity))  # Match numbers including decimals (2 -> '2')
+    return float(match.group()) if match else 1  # Default to 1 if no number found
+
+def purchase_time(purchased_at=None):
+    """(ISO timestamp, 'YYYY-MM' month bucket) for a bill; defaults to now (UTC)."""
+    if purchased_at is None:
+        purchased_at = datetime.now(timezone.utc)
+    elif isinstance(purchased_at, str):
+        purchased_at = datetime.fromisoformat(purchased_at)
+    if purchased_at.tzinfo is None:
+        purchased_at = purchased_at.replace(tzinfo=timezone.utc)
+    return purchased_at.isoformat(), purchased_at.strftime("%Y-%m")
+
+class InvalidBill(ValueError):
+    """A bill that can't be stored as given (no items, a non-numeric price, ...)."""
+
+
+def bill_params(user, bill_id, purchases, purchased_at=None):
+    """One bill, normalised the way every backend stores it."""
+    timestamp, month = purchase_time(purchased_at)
+    items = []
+    for line, purchase in enumerate(purchases):
+        items.append({
+            "line": line,
+            "item": purchase["item"],
+            "category": (purchase.get("category") or "Uncategorized").strip().lower(),
+            "price": float(purchase.get("price", 0)),  # keep your existing price logic
+            "quantity": extract_numeric_quantity(purchase.get("quantity", "1")),  # float quantity
+        })
+    return {"user": user, "bill_id": bill_id, "purchased_at": timestamp, "month": month, "items": items}
+
+
+class GroceryStore(ABC):
+    """
+    Storage operations shared by the Neo4j graph (GroceryGraph) and the embedded
+    SQLite backend (SQLiteGroceryStore). Backends implement `_write_batch` and the
+    query methods; bill normalisation, de-duplication and batching live here.
+    Categories are compared lowercased; spend queries default to the demo user.
+    """
+
+    def close(self):
+        pass
+
+    def migrate_schema(self):
+        """Creates whatever tables/constraints/indexes the backend needs."""
+        return []
+
+    def store_grocery_data(self, user, purchases, bill_id, purchased_at=None):
+        """
+        Stores one bill's purchases in a single transaction; a bill that is already
+        stored is skipped. `purchased_at` (datetime or ISO string) defaults to now.
+        """
+        stored = self.store_bills([{"user": user, "bill_id": bill_id, "purchases": purchases,
+                                    "purchased_at": purchased_at}])
+        if stored:
+            print(f"Bill {bill_id} processed successfully!")
+        else:
+            print("Bill already processed, skipping duplicate entry.")
+
+    def store_bills(self, bills, batch_size=STORE_BATCH_BILLS):
+        """
+        Bulk variant for backfills: `bills` is an iterable of
+        {"user": ..., "bill_id": ..., "purchases": [...], "purchased_at": ...} dicts
+        (purchased_at optional), written `batch_size` bills per transaction. Returns
+        the ids of the bills that were new.
+        """
+        stored, batch, seen = [], [], set()
+        for bill in bills:
+            if bill["bill_id"] in seen:  # a repeated id within one batch would race with itself
+                continue
+            seen.add(bill["bill_id"])
+            batch.append(bill_params(bill["user"], bill["bill_id"], bill["purchases"], bill.get("purchased_at")))
+            if len(batch) >= batch_size:
+                stored.extend(self._commit_batch(batch))
+                batch = []
+        if batch:
+            stored.extend(self._commit_batch(batch))
+        return stored
+
+    def _commit_batch(self, batch):
+        written = self._write_batch(batch)
+        if written:
+            # Schema/result caches built before these bills are now stale; bumped per committed
+            # batch so a later batch failing doesn't leave them on the old generation
+            graph_generation.bump()
+        return written
+
+    @abstractmethod
+    def _write_batch(self, bills):
+        """Writes normalised bills (see bill_params) in one transaction; returns the new bill ids."""
+
+    @abstractmethod
+    def item_categories(self):
+        """Yields (item name, category) for every stored item, e.g. to seed a CategoryIndex."""
+
+    @abstractmethod
+    def query_total_spent(self, category, user="Sanjana"):
+        """Total spent on one category."""
+
+    @abstractmethod
+    def query_spending_by_category(self, categories=None, user="Sanjana"):
+        """{category: total spent} for every category, or only `categories` (missing ones map to 0.0)."""
+
+    @abstractmethod
+    def query_monthly_spending(self, user="Sanjana", months=None):
+        """{'YYYY-MM': total spent} for every month (or only `months`), oldest first."""
+
+    @abstractmethod
+    def query_spending_between(self, start, end, categories=None, user="Sanjana"):
+        """{category: total spent} for purchases dated in [start, end) ('YYYY-MM-DD' strings)."""
+
+    @abstractmethod
+    def rebuild_spend_aggregates(self, user=None):
+        """Recomputes the per-category and per-month totals from the stored bills."""
+
+
+def normalize_category(category):
+    """Categories are stored trimmed and lowercased; both backends look them up the same way."""
+    return category.strip().lower()
+
+
+def normalize_categories(categories):
+    return [normalize_category(category) for category in categories if category.strip()] if categories else None
+
+
+def create_store(backend=GROCERY_STORE_BACKEND, sqlite_path=GROCERY_SQLITE_PATH):
+    """A new store for `backend` ("neo4j" or "sqlite"). Imports lazily so SQLite needs no neo4j package."""
+    if backend == "sqlite":
+        from src.knowledge_graph.sqlite_store import SQLiteGroceryStore
+        return SQLiteGroceryStore(sqlite_path)
+    if backend == "neo4j":
+        from src.knowledge_graph.neo4j_connector import GroceryGraph
+        return GroceryGraph()
+    raise ValueError(f"Unknown GROCERY_STORE_BACKEND: {backend!r} (expected 'neo4j' or 'sqlite')")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_grocery_store():
+    """The process-wide store selected by GROCERY_STORE_BACKEND (the shared GroceryGraph for neo4j)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if GROCERY_STORE_BACKEND == "neo4j":
+                    from src.knowledge_graph.neo4j_connector import get_grocery_graph
+                    _store = get_grocery_graph()
+                else:
+                    _store = create_store()
+    return _store
@@ -1,7 +1,11 @@
 from neo4j import GraphDatabase
 import os
 from dotenv import load_dotenv
-import re
+import threading
+from src.knowledge_graph.grocery_store import GroceryStore, extract_numeric_quantity, normalize_categories, \
+    normalize_category
+from src.knowledge_graph.schema_migrations import apply_migrations
+from src.knowledge_graph.spend_aggregates import rebuild_spend_aggregates
 
 # Load Neo4j credentials
 load_dotenv()
@@ -24,10 +28,97 @@ CATEGORY_MAPPING = {
     "Strawberries": "Fruits"
 }
 
-def extract_numeric_quantity(quantity):
-    """Extracts numeric values from quantity (e.g., '1.05 lb' -> 1.05, '2 pcs' -> 2)"""
-    match = re.search(r"\d+(\.\d+)?", quantity)  # Match numbers including decimals
-    return float(match.group()) if match else 1  # Default to 1 if no number found
+# All bills of a batch in one statement: bills already in the graph are filtered out
+# up front, then each new bill's items are written through a nested UNWIND and the
+# user's spend aggregates are incremented in the same transaction
+STORE_BILLS_QUERY = """
+    UNWIND $bills AS bill
+    // MERGE on the unique Bill.id is the dedup: a concurrent transaction with the same id
+    // waits on the constraint and then matches the committed bill, so only one marks it _new
+    MERGE (b:Bill {id: bill.bill_id})
+    ON CREATE SET b._new = true, b.purchased_at = datetime(bill.purchased_at), b.month = bill.month
+    WITH bill, b WHERE b._new = true
+    REMOVE b._new
+
+    MERGE (u:User {name: bill.user})
+    MERGE (u)-[:BOUGHT]->(b)
+
+    WITH u, b, bill
+    CALL {
+        WITH u, b, bill
+        UNWIND bill.items AS row
+        MERGE (i:Item {name: row.item})
+        ON CREATE SET i.total_frequency = 0  // if new item, initialize freq
+
+        MERGE (c:Category {name: row.category})
+        MERGE (i)-[:BELONGS_TO]->(c)
+
+        // One edge per purchase line (the bill is new, so CREATE is safe): what was paid
+        // on this bill, and when, survives later bills updating the shared Item node
+        CREATE (b)-[:CONTAINS {
+            line: row.line,
+            price: row.price,
+            quantity: row.quantity,
+            category: row.category,
+            purchased_at: b.purchased_at,
+            purchase_date: date(b.purchased_at)
+        }]->(i)
+
+        // Existing logic: user->item
+        MERGE (u)-[:BOUGHT]->(i)
+
+        // Set item properties
+        SET i.price = row.price,
+            i.quantity = row.quantity,
+            i.total_frequency = coalesce(i.total_frequency, 0) + row.quantity
+        RETURN count(row) AS item_count
+    }
+
+    // Per user x category totals (the _lock write takes the node lock before the
+    // read-modify-write, so concurrent bills can't lose an increment)
+    CALL {
+        WITH u, bill
+        UNWIND bill.items AS row
+        WITH u, bill, row.category AS category, sum(row.price) AS spent, count(row) AS lines
+        MERGE (s:CategorySpend {key: bill.user + '|' + category})
+        ON CREATE SET s.user = bill.user, s.category = category, s.total_spent = 0.0, s.item_count = 0
+        MERGE (u)-[:SPENT_ON]->(s)
+        SET s._lock = true
+        SET s.total_spent = s.total_spent + spent, s.item_count = s.item_count + lines
+        REMOVE s._lock
+        RETURN count(s) AS category_aggregates
+    }
+
+    // Per user x month totals
+    CALL {
+        WITH u, bill
+        MERGE (m:MonthlySpend {key: bill.user + '|' + bill.month})
+        ON CREATE SET m.user = bill.user, m.month = bill.month, m.total_spent = 0.0, m.bill_count = 0
+        MERGE (u)-[:SPENT_IN]->(m)
+        SET m._lock = true
+        SET m.total_spent = m.total_spent + reduce(total = 0.0, row IN bill.items | total + row.price),
+            m.bill_count = m.bill_count + 1
+        REMOVE m._lock
+        RETURN count(m) AS month_aggregates
+    }
+    RETURN b.id AS bill_id, item_count
+"""
+
+# Purchases in [start, end) found through the CONTAINS purchase_date range index rather
+# than by expanding every bill of the user
+SPENDING_BETWEEN_QUERY = """
+    MATCH (b:Bill)-[r:CONTAINS]->(:Item)
+    USING INDEX r:CONTAINS(purchase_date)
+    WHERE r.purchase_date >= date($start) AND r.purchase_date < date($end)
+      AND ($categories IS NULL OR r.category IN $categories)
+    MATCH (:User {name: $user})-[:BOUGHT]->(b)
+    RETURN r.category AS category, SUM(r.price) AS total_spent
+    ORDER BY total_spent DESC
+"""
+
+def _store_bills_tx(tx, bills):
+    result = tx.run(STORE_BILLS_QUERY, bills=bills)
+    return [record["bill_id"] for record in result]
 
 def get_existing_labels_and_relationships(driver):
     """
@@ -42,7 +133,7 @@ def get_existing_labels_and_relationships(driver):
     return labels, relationships
 
 
-class GroceryGraph:
+class GroceryGraph(GroceryStore):
     def __init__(self):
         """Initialize Neo4j connection."""
         self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
@@ -51,6 +142,10 @@ class GroceryGraph:
         """Close Neo4j connection."""
         self.driver.close()
 
+    def migrate_schema(self):
+        """Creates the constraints and indexes the graph relies on (pending migrations only)."""
+        return apply_migrations(self.driver)
+
     def get_category(self, item_name):
         """Returns category for an item, defaults to 'Other'."""
         for keyword, category in CATEGORY_MAPPING.items():
@@ -76,71 +171,91 @@ class GroceryGraph:
 
     
 
-    def store_grocery_data(self, user, purchases, bill_id):
+    def _write_batch(self, bills):
         """
-        Stores grocery purchases in Neo4j with:
+        Stores normalised bills in Neo4j with:
         - (u:User)-[:BOUGHT]->(b:Bill)
-        - (b:Bill)-[:CONTAINS]->(i:Item)
+        - (b:Bill)-[:CONTAINS {price, quantity, category, purchased_at, purchase_date}]->(i:Item),
+          one edge per purchase line
         - item-level 'total_frequency' accumulation
         - existing i.price and i.quantity logic
+        - (u)-[:SPENT_ON]->(:CategorySpend) and (u)-[:SPENT_IN]->(:MonthlySpend) totals
+        All bills go in one write transaction and one round trip.
         """
+        with self.driver.session() as session:
+            return session.execute_write(_store_bills_tx, bills)
 
+    def item_categories(self):
         with self.driver.session() as session:
-            # 1) Check if this bill is already processed
-            existing_bill = session.run(
-                "MATCH (b:Bill {id: $bill_id}) RETURN b", bill_id=bill_id
-            ).single()
+            result = session.run("MATCH (i:Item)-[:BELONGS_TO]->(c:Category) RETURN i.name AS item, c.name AS category")
+            return [(record["item"], record["category"]) for record in result]
 
-            if existing_bill:
-                print("Bill already processed, skipping duplicate entry.")
-                return
+    def query_total_spent(self, category, user="Sanjana"):
+        """Returns total spending on a category."""
+        with self.driver.session() as session:
+            # Maintained by store_grocery_data: one index seek instead of a traversal
+            result = session.run("""
+                MATCH (s:CategorySpend {key: $user + '|' + $category})
+                RETURN s.total_spent AS total_spent
+            """, user=user, category=normalize_category(category))
 
-            # 2) MERGE the Bill node
-            session.run(
-                "MERGE (b:Bill {id: $bill_id})",
-                bill_id=bill_id
-            )
+            # Print the raw query result for debugging
+            record = result.single()
+            print("Raw Query Result:", record)
 
-            for purchase in purchases:
-                category = purchase.get("category", "Uncategorized").strip().lower()
-                price = float(purchase.get("price", 0))  # keep your existing price logic
-                quantity = extract_numeric_quantity(purchase.get("quantity", "1"))  # float quantity
+            # Extract total spent, ensuring a float conversion
+            return record["total_spent"] if record and record["total_spent"] else 0.0
 
-                print(f"Storing: {purchase['item']} → Category: {category} → Price: {price} → Quantity: {quantity}")
+    def query_spending_by_category(self, categories=None, user="Sanjana"):
+        """One query over the precomputed CategorySpend totals, however many categories are asked for."""
+        requested = normalize_categories(categories)
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (s:CategorySpend {user: $user})
+                WHERE $categories IS NULL OR s.category IN $categories
+                RETURN s.category AS category, s.total_spent AS total_spent
+            """, user=user, categories=requested)
+            spending = {record["category"]: record["total_spent"] or 0.0 for record in result}
 
-                # 3) Link user->bill, bill->item, user->item, item->category
-                #    Also accumulate total_frequency on the item
-                session.run("""
-                    MERGE (u:User {name: $user})
-                    MERGE (b:Bill {id: $bill_id})
-                    MERGE (u)-[:BOUGHT]->(b)
-                    
-                    MERGE (i:Item {name: $item_name})
-                    ON CREATE SET i.total_frequency = 0  // if new item, initialize freq
+        if requested:
+            return {category: spending.get(category, 0.0) for category in requested}
+        return spending
 
-                    MERGE (c:Category {name: $category})
-                    MERGE (i)-[:BELONGS_TO]->(c)
-                    MERGE (b)-[:CONTAINS]->(i)
+    def query_monthly_spending(self, user="Sanjana", months=None):
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (m:MonthlySpend {user: $user})
+                WHERE $months IS NULL OR m.month IN $months
+                RETURN m.month AS month, m.total_spent AS total_spent
+                ORDER BY month
+            """, user=user, months=months)
+            return {record["month"]: record["total_spent"] for record in result}
 
-                    // Existing logic: user->item
-                    MERGE (u)-[:BOUGHT]->(i)
-                    
-                    // Set item properties
-                    SET i.price = $price,
-                        i.quantity = $quantity,
-                        i.total_frequency = coalesce(i.total_frequency, 0) + $quantity
-                """, user=user,
-                bill_id=bill_id,
-                item_name=purchase["item"],
-                category=category,
-                price=price,
-                quantity=quantity
-                )
-
-            print(f"Bill {bill_id} processed successfully!")
+    def query_spending_between(self, start, end, categories=None, user="Sanjana"):
+        with self.driver.session() as session:
+            result = session.run(SPENDING_BETWEEN_QUERY, user=user, start=start, end=end,
+                                 categories=normalize_categories(categories))
+            return {record["category"]: record["total_spent"] for record in result}
 
+    def rebuild_spend_aggregates(self, user=None):
+        return rebuild_spend_aggregates(self.driver, user)
+
+
+_grocery_graph = None
+_grocery_graph_lock = threading.Lock()
+
+def get_grocery_graph():
+    """
+    The process-wide GroceryGraph. Its driver keeps one connection pool and is safe
+    to share between threads, so callers should use it instead of opening their own.
+    """
+    global _grocery_graph
+    if _grocery_graph is None:
+        with _grocery_graph_lock:
+            if _grocery_graph is None:
+                _grocery_graph = GroceryGraph()
+    return _grocery_graph
 
-    
 
 # Example Usage
 if __name__ == "__main__":
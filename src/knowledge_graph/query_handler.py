@@ -1,28 +1,45 @@
-from src.knowledge_graph.neo4j_connector import GroceryGraph
+from datetime import date
+from src.knowledge_graph.grocery_store import get_grocery_store, normalize_category
+from src.knowledge_graph.result_cache import query_cache
+
+# Thin wrappers over the process-wide store (the shared GroceryGraph by default, or the
+# embedded SQLite store with GROCERY_STORE_BACKEND=sqlite): no new connection pool per call.
+# Results are cached until the next stored bill (see result_cache), keyed by method + arguments
 
 
 def query_total_spent(category):
     """Returns total spending on a category."""
-    grocery_graph = GroceryGraph()
-    
-    with grocery_graph.driver.session() as session:
-        result = session.run("""
-            MATCH (u:User {name: 'Sanjana'})-[:BOUGHT]->(i:Item)-[:BELONGS_TO]->(c:Category)
-            WHERE toLower(c.name) = toLower($category)
-            RETURN SUM(toFloat(i.price)) AS total_spent
-        """, category=category)
-        
-        # Print the raw query result for debugging
-        record = result.single()
-        print("Raw Query Result:", record)
+    category = normalize_category(category)  # " Dairy" and "dairy" share a cache entry on either backend
+    return query_cache.get_or_run("query_total_spent", {"category": category},
+                                  lambda: get_grocery_store().query_total_spent(category))
+
+def query_spending_by_category(categories=None, user="Sanjana"):
+    """
+    Returns {category: total spent} for every category the user has bought from, or
+    only for `categories` (requested categories with no purchases map to 0.0).
+    One query, however many categories are asked for.
+    """
+    return query_cache.get_or_run("query_spending_by_category", {"categories": categories, "user": user},
+                                  lambda: get_grocery_store().query_spending_by_category(categories, user))
+
+def query_monthly_spending(user="Sanjana", months=None):
+    """Returns {'YYYY-MM': total spent} for every month (or only `months`), oldest first."""
+    return query_cache.get_or_run("query_monthly_spending", {"user": user, "months": months},
+                                  lambda: get_grocery_store().query_monthly_spending(user, months))
 
-        # Extract total spent, ensuring a float conversion
-        total_spent = record["total_spent"] if record and record["total_spent"] else 0.0
-        grocery_graph.close()
-        
-        return total_spent
+def query_spending_between(start, end, categories=None, user="Sanjana"):
+    """
+    Returns {category: total spent} for purchases dated in [start, end) (dates or
+    'YYYY-MM-DD' strings), optionally only for `categories`.
+    """
+    start = start.isoformat() if isinstance(start, date) else start
+    end = end.isoformat() if isinstance(end, date) else end
+    return query_cache.get_or_run("query_spending_between",
+                                  {"start": start, "end": end, "categories": categories, "user": user},
+                                  lambda: get_grocery_store().query_spending_between(start, end, categories, user))
 
 # Example Usage
 if __name__ == "__main__":
     total_spent = query_total_spent("Spices")
     print(f"Total spent on Dairy: ${total_spent:.2f}")
+    print(query_spending_by_category())
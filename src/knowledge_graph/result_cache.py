@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from src.knowledge_graph.graph_version import graph_generation
+
+# Load query result cache settings
+load_dotenv()
+QUERY_CACHE = os.getenv("QUERY_CACHE", "true").lower() in ("1", "true", "yes")
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Writes from this process clear the cache through the generation counter; the TTL
+# bounds staleness after writes by other processes (other API workers, bill imports)
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+
+# String literals are kept as written; whitespace between tokens is collapsed
+_CYPHER_TOKEN_RE = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+""")
+_WRITE_CLAUSE_RE = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b|\bIN\s+TRANSACTIONS\b",
+                              re.IGNORECASE)
+
+
+def normalize_cypher(cypher):
+    """Collapses whitespace outside string literals and drops a trailing ';'."""
+    return _CYPHER_TOKEN_RE.sub(lambda m: m.group(1) or " ", cypher).strip().rstrip(";").rstrip()
+
+
+def is_read_only(cypher):
+    """False for anything that might write; those queries are never cached."""
+    stripped = _CYPHER_TOKEN_RE.sub(lambda m: "''" if m.group(1) else " ", cypher)  # ignore words inside literals
+    return not _WRITE_CLAUSE_RE.search(stripped)
+
+
+class QueryResultCache:
+    """
+    In-memory LRU cache of graph query results, keyed by the normalised Cypher text (or a
+    store method name) plus its parameters. The whole cache belongs to one graph
+    generation: the first lookup after a write empties it. Entries are sized by their
+    JSON encoding and the least recently used are evicted past `max_bytes`.
+    Results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes=QUERY_CACHE_MAX_BYTES, ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+                 generation=graph_generation, enabled=QUERY_CACHE):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.generation = generation
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (result, size, stored_at), least recently used first
+        self._total_bytes = 0
+        self._generation = generation.current()
+
+    @staticmethod
+    def _key(query, params):
+        return f"{normalize_cypher(query)}\0{json.dumps(params or {}, sort_keys=True, default=str)}"
+
+    def _check_generation(self):
+        current = self.generation.current()
+        if current != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._total_bytes = 0
+            self._generation = current
+
+    def get_or_run(self, query, params, run):
+        """
+        Returns the cached result for (query, params), or calls `run()` and caches what it
+        returns. Exceptions from `run` propagate and nothing is cached; so do write queries.
+        """
+        if not self.enabled or not is_read_only(query):
+            return run()
+        key = self._key(query, params)
+        now = time.monotonic()
+        with self._lock:
+            self._check_generation()
+            entry = self._entries.get(key)
+            if entry and self.ttl_seconds and now - entry[2] > self.ttl_seconds:
+                self._forget(key)
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        result = run()
+        try:
+            size = len(key) + len(json.dumps(result, default=str))
+        except (TypeError, ValueError):
+            return result  # not sizeable (e.g. circular); just don't cache it
+        with self._lock:
+            self._check_generation()
+            # A write committed while the query ran may not be in `result`
+            if generation == self._generation and size <= self.max_bytes:
+                self._forget(key)
+                self._entries[key] = (result, size, now)
+                self._total_bytes += size
+                self._evict()
+        return result
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total_bytes -= entry[1]
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "generation": self._generation,
+        }
+
+
+# Shared by execute_cypher_query (/ask) and the spend queries (/spending)
+query_cache = QueryResultCache()
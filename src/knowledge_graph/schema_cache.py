@@ -0,0 +1,104 @@
+import json
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+
+from src.knowledge_graph.graph_version import graph_generation
+from src.knowledge_graph.schema_migrations import INTERNAL_LABELS
+
+# Load schema cache settings
+load_dotenv()
+# Writes from this process refresh the schema through the generation counter; the TTL
+# catches writes made by other processes (other API workers, imports, the Neo4j browser)
+SCHEMA_CACHE_TTL_SECONDS = float(os.getenv("SCHEMA_CACHE_TTL_SECONDS", "300"))
+
+
+class SchemaDigest:
+    """
+    Labels, relationship types and per-label properties of the graph, plus everything
+    derived from them for prompting and validation, computed once per schema fetch.
+    """
+
+    def __init__(self, labels, relationships, properties):
+        self.labels = [label for label in labels if label not in INTERNAL_LABELS]
+        self.relationships = relationships
+        self.properties = {label: props for label, props in properties.items() if label not in INTERNAL_LABELS}
+        self.properties_json = json.dumps(self.properties, indent=2)
+        self._property_sets = {label: set(props) for label, props in self.properties.items()}
+        # One pass over the query finds every "Label.property" reference
+        self._label_property_re = (
+            re.compile(r"\b(" + "|".join(re.escape(label) for label in self.labels) + r")\.([a-zA-Z0-9_]+)")
+            if self.labels else None
+        )
+
+    def invalid_properties(self, query):
+        """'Label.property' references in `query` whose property the label doesn't have."""
+        if self._label_property_re is None:
+            return []
+        return [f"{label}.{prop}" for label, prop in self._label_property_re.findall(query)
+                if prop not in self._property_sets.get(label, ())]
+
+    def missing_relationships(self, query):
+        return [relationship for relationship in self.relationships if relationship not in query]
+
+
+class SchemaCache:
+    """
+    Caches the SchemaDigest built by `fetch` (a callable returning labels, relationships
+    and properties). A cached digest is reused until the graph generation changes or
+    it is older than `ttl_seconds`; concurrent misses share a single fetch.
+    """
+
+    def __init__(self, fetch, ttl_seconds=SCHEMA_CACHE_TTL_SECONDS, generation=graph_generation):
+        self.fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._digest = None
+        self._digest_generation = None
+        self._fetched_at = 0.0
+
+    def _is_fresh(self):
+        return (self._digest is not None
+                and self._digest_generation == self.generation.current()
+                and (not self.ttl_seconds or time.monotonic() - self._fetched_at < self.ttl_seconds))
+
+    def peek(self):
+        """The cached digest if it is still fresh, else None. Never touches Neo4j."""
+        if self._is_fresh():
+            self.hits += 1
+            return self._digest
+        return None
+
+    def get(self):
+        """The current SchemaDigest, fetched from Neo4j only when the cached one is stale."""
+        digest = self.peek()
+        if digest is not None:
+            return digest
+        with self._lock:
+            if self._is_fresh():  # another request refreshed it while we waited
+                self.hits += 1
+                return self._digest
+            generation = self.generation.current()  # read before fetching: a write during the fetch leaves it stale
+            self._digest = SchemaDigest(*self.fetch())
+            self._digest_generation = generation
+            self._fetched_at = time.monotonic()
+            self.misses += 1
+            return self._digest
+
+    def invalidate(self):
+        with self._lock:
+            self._digest = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "generation": self._digest_generation,
+        }
@@ -0,0 +1,177 @@
+"""
+Versioned, idempotent schema migrations for the grocery graph.
+
+Each migration is a list of Cypher schema statements (all `IF NOT EXISTS`) or
+idempotent data steps (functions of the driver), and is recorded as a
+(:SchemaMigration {version}) node once applied, so startup only runs what is new.
+Usage from the repository root:
+
+    python -m src.knowledge_graph.schema_migrations               # apply pending migrations
+    python -m src.knowledge_graph.schema_migrations --status      # list applied/pending versions
+    python -m src.knowledge_graph.schema_migrations --check-plans # EXPLAIN the hot queries
+"""
+import argparse
+import sys
+
+from src.knowledge_graph.spend_aggregates import rebuild_spend_aggregates
+
+# Bookkeeping label; hidden from the schema shown to GPT-4
+MIGRATION_LABEL = "SchemaMigration"
+INTERNAL_LABELS = {MIGRATION_LABEL}
+
+# (version, description, statements). Append new versions; never edit applied ones.
+MIGRATIONS = [
+    (1, "uniqueness constraints on MERGE keys", [
+        "CREATE CONSTRAINT schema_migration_version IF NOT EXISTS FOR (m:SchemaMigration) REQUIRE m.version IS UNIQUE",
+        "CREATE CONSTRAINT user_name IF NOT EXISTS FOR (u:User) REQUIRE u.name IS UNIQUE",
+        "CREATE CONSTRAINT item_name IF NOT EXISTS FOR (i:Item) REQUIRE i.name IS UNIQUE",
+        "CREATE CONSTRAINT category_name IF NOT EXISTS FOR (c:Category) REQUIRE c.name IS UNIQUE",
+        "CREATE CONSTRAINT bill_id IF NOT EXISTS FOR (b:Bill) REQUIRE b.id IS UNIQUE",
+    ]),
+    (2, "spend aggregates keyed by user x category and user x month", [
+        "CREATE CONSTRAINT category_spend_key IF NOT EXISTS FOR (s:CategorySpend) REQUIRE s.key IS UNIQUE",
+        "CREATE CONSTRAINT monthly_spend_key IF NOT EXISTS FOR (m:MonthlySpend) REQUIRE m.key IS UNIQUE",
+        "CREATE INDEX category_spend_user IF NOT EXISTS FOR (s:CategorySpend) ON (s.user)",
+        "CREATE INDEX monthly_spend_user IF NOT EXISTS FOR (m:MonthlySpend) ON (m.user)",
+    ]),
+    (3, "per-purchase CONTAINS edges with indexed purchase dates", [
+        "CREATE INDEX contains_purchase_date IF NOT EXISTS FOR ()-[r:CONTAINS]-() ON (r.purchase_date)",
+        # Backfill edges written before per-purchase properties existed: the item's last
+        # known price/quantity is the best record left. Bills without a purchase date keep
+        # a null purchase_date and stay out of date-range queries.
+        """
+        MATCH (b:Bill)-[r:CONTAINS]->(i:Item)
+        WHERE r.price IS NULL
+        CALL {
+            WITH b, r, i
+            OPTIONAL MATCH (i)-[:BELONGS_TO]->(c:Category)
+            WITH b, r, i, head(collect(c.name)) AS item_category
+            SET r.price = toFloat(coalesce(i.price, 0)),
+                r.quantity = coalesce(i.quantity, 1),
+                r.category = coalesce(item_category, 'uncategorized'),
+                r.purchased_at = b.purchased_at,
+                r.purchase_date = CASE WHEN b.purchased_at IS NULL THEN null ELSE date(b.purchased_at) END
+        } IN TRANSACTIONS OF 10000 ROWS
+        """,
+    ]),
+    # /spending and the router read only the aggregates: graphs with bills stored before
+    # migration 2 would report no spend until rebuilt
+    (4, "build spend aggregates for bills stored before they existed", [
+        rebuild_spend_aggregates,
+    ]),
+]
+
+# Queries on the write and read paths, with the operator each one should start from
+PLAN_CHECKS = [
+    ("bill lookup", "MATCH (b:Bill {id: $id}) RETURN b", {"id": "x"}, "NodeUniqueIndexSeek"),
+    ("user lookup", "MATCH (u:User {name: $name}) RETURN u", {"name": "x"}, "NodeUniqueIndexSeek"),
+    ("item MERGE", "MERGE (i:Item {name: $name})", {"name": "x"}, "NodeUniqueIndexSeek"),
+    ("category MERGE", "MERGE (c:Category {name: $name})", {"name": "x"}, "NodeUniqueIndexSeek"),
+    ("category spend lookup", "MATCH (s:CategorySpend {key: $key}) RETURN s.total_spent", {"key": "x|y"},
+     "NodeUniqueIndexSeek"),
+    ("user spend by category", "MATCH (s:CategorySpend {user: $user}) RETURN s.category, s.total_spent",
+     {"user": "x"}, "NodeIndexSeek"),
+    ("user spend by month", "MATCH (m:MonthlySpend {user: $user}) RETURN m.month, m.total_spent",
+     {"user": "x"}, "NodeIndexSeek"),
+]
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
+
+def applied_versions(driver):
+    with driver.session() as session:
+        result = session.run(f"MATCH (m:{MIGRATION_LABEL}) RETURN m.version AS version")
+        return {record["version"] for record in result}
+
+
+def apply_migrations(driver, migrations=MIGRATIONS):
+    """Applies every migration not yet recorded in the graph; returns the versions applied."""
+    done = applied_versions(driver)
+    applied = []
+    for version, description, statements in migrations:
+        if version in done:
+            continue
+        print(f"🛠️ Applying schema migration {version}: {description}")
+        with driver.session() as session:
+            # Schema changes can't share a transaction with writes, so each statement is
+            # auto-committed; they are all IF NOT EXISTS (data steps idempotent), so a failed
+            # run can simply be retried
+            for statement in statements:
+                try:
+                    if callable(statement):
+                        statement(driver)
+                    else:
+                        session.run(statement).consume()
+                except Exception as e:
+                    step = getattr(statement, "__name__", statement)
+                    print(f"❌ Schema migration {version} failed on: {step}\n   {e}")
+                    raise
+            session.run(f"""
+                MERGE (m:{MIGRATION_LABEL} {{version: $version}})
+                SET m.description = $description, m.applied_at = datetime()
+            """, version=version, description=description).consume()
+        applied.append(version)
+    if not applied:
+        print("✅ Graph schema is up to date.")
+    return applied
+
+
+def _plan_operators(plan):
+    """Operator names of an EXPLAIN plan tree ('NodeUniqueIndexSeek@neo4j' -> 'NodeUniqueIndexSeek')."""
+    operators = [plan["operatorType"].split("@")[0]]
+    for child in plan.get("children", []):
+        operators.extend(_plan_operators(child))
+    return operators
+
+
+def _read_path_checks():
+    # Imported here: the connector imports this module
+    from src.knowledge_graph.neo4j_connector import SPENDING_BETWEEN_QUERY
+    return [
+        ("spend in date range", SPENDING_BETWEEN_QUERY,
+         {"user": "x", "start": "2024-01-01", "end": "2024-02-01", "categories": None},
+         "RelationshipIndexSeekByRange"),
+    ]
+
+
+def check_query_plans(driver, checks=None):
+    """EXPLAINs each check query; returns (name, ok, operators) and prints a report."""
+    checks = checks or PLAN_CHECKS + _read_path_checks()
+    report = []
+    with driver.session() as session:
+        for name, query, params, expected in checks:
+            plan = session.run(f"EXPLAIN {query}", params).consume().plan
+            operators = _plan_operators(plan) if plan else []
+            # Matched as a substring: 'NodeUniqueIndexSeek(Locking)' for MERGE,
+            # 'DirectedRelationshipIndexSeekByRange' for relationship indexes
+            ok = any(expected in op for op in operators) and not SCAN_OPERATORS.intersection(operators)
+            report.append((name, ok, operators))
+            print(f"{'✅' if ok else '⚠️'} {name}: {' <- '.join(operators)}")
+    return report
+
+
+def main():
+    from src.knowledge_graph.neo4j_connector import GroceryGraph
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--status", action="store_true", help="list applied and pending migrations only")
+    arg_parser.add_argument("--check-plans", action="store_true", help="verify the hot queries use the indexes")
+    args = arg_parser.parse_args()
+
+    grocery_graph = GroceryGraph()
+    try:
+        if args.status:
+            done = applied_versions(grocery_graph.driver)
+            for version, description, _ in MIGRATIONS:
+                print(f"{'applied' if version in done else 'pending':<8} {version:>3}  {description}")
+            return 0
+        apply_migrations(grocery_graph.driver)
+        if args.check_plans:
+            report = check_query_plans(grocery_graph.driver)
+            return 0 if all(ok for _, ok, _ in report) else 1
+        return 0
+    finally:
+        grocery_graph.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Precomputed spend totals kept next to the purchase data:
+
+    (:User)-[:SPENT_ON]->(:CategorySpend {key: 'user|category', total_spent, item_count})
+    (:User)-[:SPENT_IN]->(:MonthlySpend {key: 'user|YYYY-MM', total_spent, bill_count})
+
+GroceryGraph.store_bills increments them in the same transaction as the bill, so
+reads are a single index seek however long the purchase history is. `rebuild`
+recomputes them from the bills (e.g. after manual edits or an import that bypassed
+store_bills):
+
+    python -m src.knowledge_graph.spend_aggregates --rebuild [--user Sanjana]
+
+A running API keeps serving cached totals until its caches expire, so restart it
+after a rebuild.
+"""
+import argparse
+
+CLEAR_QUERY = """
+    MATCH (s) WHERE (s:CategorySpend OR s:MonthlySpend) AND ($user IS NULL OR s.user = $user)
+    DETACH DELETE s
+"""
+
+# One category per purchase line: the category recorded on the line if there is one,
+# else the item's first category
+REBUILD_CATEGORY_QUERY = """
+    MATCH (u:User)-[:BOUGHT]->(b:Bill)-[r:CONTAINS]->(i:Item)
+    WHERE $user IS NULL OR u.name = $user
+    OPTIONAL MATCH (i)-[:BELONGS_TO]->(c:Category)
+    WITH u, r, i, head(collect(c.name)) AS item_category
+    WITH u, r, i, coalesce(r.category, item_category, 'uncategorized') AS category
+    WITH u, category, sum(toFloat(coalesce(r.price, i.price, 0))) AS spent, count(r) AS lines
+    MERGE (s:CategorySpend {key: u.name + '|' + category})
+    SET s.user = u.name, s.category = category, s.total_spent = spent, s.item_count = lines
+    MERGE (u)-[:SPENT_ON]->(s)
+    RETURN count(s) AS aggregates
+"""
+
+# Bills stored before purchase dates were recorded have no month and are left out
+REBUILD_MONTHLY_QUERY = """
+    MATCH (u:User)-[:BOUGHT]->(b:Bill)
+    WHERE ($user IS NULL OR u.name = $user) AND b.month IS NOT NULL
+    OPTIONAL MATCH (b)-[r:CONTAINS]->(i:Item)
+    WITH u, b, sum(toFloat(coalesce(r.price, i.price, 0))) AS bill_total
+    WITH u, b.month AS month, sum(bill_total) AS spent, count(b) AS bills
+    MERGE (m:MonthlySpend {key: u.name + '|' + month})
+    SET m.user = u.name, m.month = month, m.total_spent = spent, m.bill_count = bills
+    MERGE (u)-[:SPENT_IN]->(m)
+    RETURN count(m) AS aggregates
+"""
+
+
+def _rebuild_tx(tx, user):
+    tx.run(CLEAR_QUERY, user=user).consume()
+    categories = tx.run(REBUILD_CATEGORY_QUERY, user=user).single()["aggregates"]
+    months = tx.run(REBUILD_MONTHLY_QUERY, user=user).single()["aggregates"]
+    return categories, months
+
+
+def rebuild_spend_aggregates(driver, user=None):
+    """
+    Recomputes every CategorySpend/MonthlySpend node (for one user, or all) from the
+    bills in one transaction, so readers never see half-rebuilt totals.
+    """
+    with driver.session() as session:
+        categories, months = session.execute_write(_rebuild_tx, user)
+    print(f"✅ Rebuilt {categories} category and {months} monthly spend aggregates.")
+    return categories, months
+
+
+def main():
+    from src.knowledge_graph.neo4j_connector import GroceryGraph
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--rebuild", action="store_true", help="recompute the aggregates from the bills")
+    arg_parser.add_argument("--user", help="only this user's aggregates")
+    args = arg_parser.parse_args()
+    if not args.rebuild:
+        arg_parser.print_help()
+        return
+
+    grocery_graph = GroceryGraph()
+    try:
+        rebuild_spend_aggregates(grocery_graph.driver, args.user)
+        # The generation counter lives in each API process, so a bump here would reach no cache
+        print("ℹ️ Restart the API so cached /spending and /ask results pick up the rebuilt totals.")
+    finally:
+        grocery_graph.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+
+from src.knowledge_graph.grocery_store import GroceryStore, normalize_categories, normalize_category
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS bills (
+        id TEXT PRIMARY KEY,
+        user TEXT NOT NULL,
+        purchased_at TEXT NOT NULL,
+        month TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_bills_user ON bills (user);
+
+    CREATE TABLE IF NOT EXISTS items (
+        name TEXT PRIMARY KEY,
+        price REAL,
+        quantity REAL,
+        total_frequency REAL NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS item_categories (
+        item TEXT NOT NULL,
+        category TEXT NOT NULL,
+        PRIMARY KEY (item, category)
+    );
+
+    -- One row per purchase line, like the CONTAINS edges in the graph
+    CREATE TABLE IF NOT EXISTS purchases (
+        bill_id TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        item TEXT NOT NULL,
+        category TEXT NOT NULL,
+        price REAL NOT NULL,
+        quantity REAL NOT NULL,
+        purchase_date TEXT NOT NULL,
+        PRIMARY KEY (bill_id, line)
+    );
+    CREATE INDEX IF NOT EXISTS idx_purchases_date ON purchases (purchase_date);
+
+    CREATE TABLE IF NOT EXISTS category_spend (
+        user TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total_spent REAL NOT NULL,
+        item_count INTEGER NOT NULL,
+        PRIMARY KEY (user, category)
+    );
+    CREATE TABLE IF NOT EXISTS monthly_spend (
+        user TEXT NOT NULL,
+        month TEXT NOT NULL,
+        total_spent REAL NOT NULL,
+        bill_count INTEGER NOT NULL,
+        PRIMARY KEY (user, month)
+    );
+"""
+
+
+class SQLiteGroceryStore(GroceryStore):
+    """
+    Embedded GroceryStore backed by one SQLite file (or ":memory:"), for development,
+    tests and benchmarks without a Neo4j server. Same operations and aggregates as
+    GroceryGraph: purchase lines, item totals, per-category and per-month spend.
+    """
+
+    def __init__(self, path=":memory:"):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.migrate_schema()
+
+    def close(self):
+        self._conn.close()
+
+    def migrate_schema(self):
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+        return []
+
+    def _write_batch(self, bills):
+        stored = []
+        with self._lock, self._conn:  # one transaction for the whole batch
+            for bill in bills:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO bills (id, user, purchased_at, month) VALUES (?, ?, ?, ?)",
+                    (bill["bill_id"], bill["user"], bill["purchased_at"], bill["month"]),
+                ).rowcount
+                if not inserted:
+                    continue  # already stored
+                items = bill["items"]
+                purchase_date = bill["purchased_at"][:10]
+                self._conn.executemany(
+                    "INSERT INTO purchases (bill_id, line, item, category, price, quantity, purchase_date) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(bill["bill_id"], row["line"], row["item"], row["category"], row["price"], row["quantity"],
+                      purchase_date) for row in items],
+                )
+                self._conn.executemany(
+                    "INSERT INTO items (name, price, quantity, total_frequency) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET price = excluded.price, quantity = excluded.quantity, "
+                    "total_frequency = total_frequency + excluded.total_frequency",
+                    [(row["item"], row["price"], row["quantity"], row["quantity"]) for row in items],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO item_categories (item, category) VALUES (?, ?)",
+                    [(row["item"], row["category"]) for row in items],
+                )
+
+                per_category = {}
+                for row in items:
+                    spent, lines = per_category.get(row["category"], (0.0, 0))
+                    per_category[row["category"]] = (spent + row["price"], lines + 1)
+                self._conn.executemany(
+                    "INSERT INTO category_spend (user, category, total_spent, item_count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (user, category) DO UPDATE SET total_spent = total_spent + excluded.total_spent, "
+                    "item_count = item_count + excluded.item_count",
+                    [(bill["user"], category, spent, lines) for category, (spent, lines) in per_category.items()],
+                )
+                self._conn.execute(
+                    "INSERT INTO monthly_spend (user, month, total_spent, bill_count) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT (user, month) DO UPDATE SET total_spent = total_spent + excluded.total_spent, "
+                    "bill_count = bill_count + 1",
+                    (bill["user"], bill["month"], sum(row["price"] for row in items)),
+                )
+                stored.append(bill["bill_id"])
+        return stored
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def item_categories(self):
+        return self._query("SELECT item, category FROM item_categories")
+
+    def query_total_spent(self, category, user="Sanjana"):
+        rows = self._query("SELECT total_spent FROM category_spend WHERE user = ? AND category = ?",
+                           (user, normalize_category(category)))
+        return rows[0][0] if rows and rows[0][0] else 0.0
+
+    def query_spending_by_category(self, categories=None, user="Sanjana"):
+        requested = normalize_categories(categories)
+        sql = "SELECT category, total_spent FROM category_spend WHERE user = ?"
+        params = [user]
+        if requested:
+            sql += f" AND category IN ({', '.join('?' * len(requested))})"
+            params += requested
+        spending = dict(self._query(sql, params))
+        if requested:
+            return {category: spending.get(category, 0.0) for category in requested}
+        return spending
+
+    def query_monthly_spending(self, user="Sanjana", months=None):
+        sql = "SELECT month, total_spent FROM monthly_spend WHERE user = ?"
+        params = [user]
+        if months:
+            sql += f" AND month IN ({', '.join('?' * len(months))})"
+            params += list(months)
+        return dict(self._query(sql + " ORDER BY month", params))
+
+    def query_spending_between(self, start, end, categories=None, user="Sanjana"):
+        requested = normalize_categories(categories)
+        # Range scan on the purchase date index, then the user check per bill (as in the graph);
+        # without statistics SQLite would otherwise start from every bill of the user
+        sql = ("SELECT p.category, SUM(p.price) AS total_spent "
+               "FROM purchases p INDEXED BY idx_purchases_date JOIN bills b ON b.id = p.bill_id "
+               "WHERE p.purchase_date >= ? AND p.purchase_date < ? AND b.user = ?")
+        params = [start, end, user]
+        if requested:
+            sql += f" AND p.category IN ({', '.join('?' * len(requested))})"
+            params += requested
+        return dict(self._query(sql + " GROUP BY p.category ORDER BY total_spent DESC", params))
+
+    def rebuild_spend_aggregates(self, user=None):
+        where, params = ("WHERE b.user = ?", (user,)) if user else ("", ())
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM category_spend {'WHERE user = ?' if user else ''}", params)
+            self._conn.execute(f"DELETE FROM monthly_spend {'WHERE user = ?' if user else ''}", params)
+            categories = self._conn.execute(f"""
+                INSERT INTO category_spend (user, category, total_spent, item_count)
+                SELECT b.user, p.category, SUM(p.price), COUNT(*)
+                FROM purchases p JOIN bills b ON b.id = p.bill_id {where}
+                GROUP BY b.user, p.category
+            """, params).rowcount
+            months = self._conn.execute(f"""
+                INSERT INTO monthly_spend (user, month, total_spent, bill_count)
+                SELECT b.user, b.month, COALESCE(SUM(p.price), 0), COUNT(DISTINCT b.id)
+                FROM bills b LEFT JOIN purchases p ON p.bill_id = b.id {where}
+                GROUP BY b.user, b.month
+            """, params).rowcount
+        print(f"✅ Rebuilt {categories} category and {months} monthly spend aggregates.")
+        return categories, months
@@ -0,0 +1,198 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from dotenv import load_dotenv
+
+from src.knowledge_graph.grocery_store import InvalidBill, bill_params
+
+# Load write queue settings
+load_dotenv()
+GRAPH_WRITE_QUEUE = os.getenv("GRAPH_WRITE_QUEUE", "true").lower() in ("1", "true", "yes")
+GRAPH_WRITE_WORKERS = int(os.getenv("GRAPH_WRITE_WORKERS", "2"))
+GRAPH_WRITE_QUEUE_SIZE = int(os.getenv("GRAPH_WRITE_QUEUE_SIZE", "1000"))  # bills waiting before submit blocks
+GRAPH_WRITE_BATCH_BILLS = int(os.getenv("GRAPH_WRITE_BATCH_BILLS", "50"))  # bills coalesced per transaction
+GRAPH_WRITE_LINGER_MS = float(os.getenv("GRAPH_WRITE_LINGER_MS", "20"))  # wait for more bills to batch with
+GRAPH_WRITE_SUBMIT_TIMEOUT = float(os.getenv("GRAPH_WRITE_SUBMIT_TIMEOUT", "10"))  # backpressure limit
+GRAPH_WRITE_DURABLE_TIMEOUT = float(os.getenv("GRAPH_WRITE_DURABLE_TIMEOUT", "30"))  # durable=true uploads
+GRAPH_WRITE_SHUTDOWN_TIMEOUT = float(os.getenv("GRAPH_WRITE_SHUTDOWN_TIMEOUT", "30"))
+
+
+class WriteQueueFull(RuntimeError):
+    """Raised when a bill can't be queued within the submit timeout (writers are behind)."""
+
+
+class WriteTicket:
+    """Tracks one queued bill; `wait` blocks until it has been written (or failed)."""
+
+    def __init__(self, bill):
+        self.bill = bill
+        self.bill_id = bill["bill_id"]
+        self.stored = None  # True once written, False if it was already in the store
+        self.error = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """True once the bill is persisted (or was already); raises the write error if it failed."""
+        if not self._done.wait(timeout):
+            return False
+        if self.error:
+            raise self.error
+        return True
+
+    def add_done_callback(self, callback):
+        """Calls `callback(ticket)` on the writer thread once the write finishes (now, if it has)."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, stored=None, error=None):
+        with self._lock:
+            self.stored, self.error = stored, error
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"⚠️ Write callback failed for bill {self.bill_id}: {e}")
+
+
+class GraphWriteQueue:
+    """
+    Write-behind queue in front of a GroceryStore. Worker threads take up to
+    `batch_size` queued bills at a time (waiting `linger_seconds` for more to arrive)
+    and write them with one `store_bills` call, so bills from concurrent uploads share
+    transactions. If a batch fails, its bills are retried one at a time so only the
+    bad bill fails. The queue is bounded: `submit` blocks when it is full and raises
+    WriteQueueFull after `submit_timeout`. Pending bills are flushed at interpreter exit.
+    """
+
+    def __init__(self, store, workers=GRAPH_WRITE_WORKERS, max_pending=GRAPH_WRITE_QUEUE_SIZE,
+                 batch_size=GRAPH_WRITE_BATCH_BILLS, linger_seconds=GRAPH_WRITE_LINGER_MS / 1000,
+                 submit_timeout=GRAPH_WRITE_SUBMIT_TIMEOUT):
+        self.store = store
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self.submit_timeout = submit_timeout
+        self.counters = {"submitted": 0, "written": 0, "duplicates": 0, "failed": 0, "batches": 0}
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._counter_lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._run, name=f"graph-writer-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.close)
+
+    def submit(self, user, purchases, bill_id, purchased_at=None, timeout=None):
+        """Queues one bill for writing and returns its WriteTicket. Raises InvalidBill for a malformed bill."""
+        if self._closed:
+            raise RuntimeError("GraphWriteQueue is closed")
+        try:
+            bill_params(user, bill_id, purchases, purchased_at)  # fail this request now, not the whole batch later
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise InvalidBill(f"Bill {bill_id} can't be stored: {e!r}") from None
+        ticket = WriteTicket({"user": user, "bill_id": bill_id, "purchases": purchases, "purchased_at": purchased_at})
+        try:
+            self._queue.put(ticket, timeout=self.submit_timeout if timeout is None else timeout)
+        except queue.Full:
+            raise WriteQueueFull(f"Graph write queue is full ({self._queue.maxsize} bills pending)") from None
+        self._count("submitted")
+        return ticket
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            self.counters[name] += amount
+
+    def _next_batch(self):
+        """Blocks for one ticket, then gathers more for up to `linger_seconds`. None means stop."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        give_up_at = time.monotonic() + self.linger_seconds
+        while len(batch) < self.batch_size:
+            remaining = give_up_at - time.monotonic()
+            try:
+                ticket = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if ticket is None:  # stop signal: finish this batch first, then let the next get see it
+                self._queue.task_done()
+                self._queue.put(None)
+                break
+            batch.append(ticket)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                self._queue.task_done()
+                return
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        """Writes a batch in one store_bills call; if that fails, retries each bill on its own."""
+        try:
+            stored = set(self.store.store_bills([ticket.bill for ticket in batch], batch_size=len(batch)))
+        except Exception as e:
+            if len(batch) > 1:
+                print(f"⚠️ Graph write failed for {len(batch)} bill(s), retrying one at a time: {e}")
+                for ticket in batch:
+                    self._write([ticket])
+                return
+            print(f"❌ Graph write failed for bill {batch[0].bill_id}: {e}")
+            self._count("failed")
+            batch[0]._finish(error=e)
+        else:
+            self._count("batches")
+            self._count("written", len(stored))
+            self._count("duplicates", len(batch) - len(stored))
+            for ticket in batch:
+                ticket._finish(stored=ticket.bill_id in stored)
+
+    def flush(self, timeout=None):
+        """Waits until every bill queued so far has been written; False on timeout."""
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if give_up_at is None else give_up_at - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=GRAPH_WRITE_SHUTDOWN_TIMEOUT):
+        """Stops accepting bills, writes what is pending and stops the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        pending = self._queue.qsize()
+        if pending:
+            print(f"⏳ Flushing {pending} pending graph write(s)...")
+        if not self.flush(timeout):
+            print(f"⚠️ Graph write queue not drained after {timeout}s; {self._queue.qsize()} bill(s) not written.")
+            return
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def stats(self):
+        with self._counter_lock:
+            return {**self.counters, "pending": self._queue.qsize()}
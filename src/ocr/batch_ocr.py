@@ -0,0 +1,156 @@
+"""
+Batch OCR over many receipt images using a process pool.
+
+Usage (from the repository root):
+    python -m src.ocr.batch_ocr data/ "scans/**/*.jpg" --workers 4 --torch-threads 2 \
+        --checkpoint backfill.jsonl
+
+Each finished image is appended to the checkpoint file as a JSON line
+({"path", "raw_text", "cleaned_lines"}), so re-running the same command skips
+images that were already processed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from glob import glob
+
+from src.ocr.ocr_extractor import clean_ocr_text, extract_text_easyocr
+from src.ocr.reader_pool import get_reader_pool, warm_up_reader_pool
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+OCRRecord = namedtuple("OCRRecord", ["path", "raw_text", "cleaned_lines"])
+
+
+def iter_image_paths(source):
+    """Expands a directory, glob pattern, single path or iterable of those into image paths."""
+    if isinstance(source, (str, os.PathLike)):
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(source, name)
+        elif any(ch in source for ch in "*?["):
+            for path in sorted(glob(source, recursive=True)):
+                if path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield path
+        else:
+            yield source
+    else:
+        for item in source:
+            yield from iter_image_paths(item)
+
+
+def load_checkpoint(checkpoint_path):
+    """Returns the set of image paths already recorded in a checkpoint file."""
+    done = set()
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue  # Partially written last line from an interrupted run
+    return done
+
+
+def truncate_partial_line(checkpoint_path):
+    """Cuts off a last line left unfinished by an interrupted run, so new records start on their own line."""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return
+    with open(checkpoint_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _init_worker(torch_threads):
+    """Limits torch's intra-op threads and loads this process's OCR reader once."""
+    import torch
+    torch.set_num_threads(torch_threads)
+    # The worker processes already use the CPUs; tiled images shouldn't load more readers per worker
+    get_reader_pool().size = 1
+    warm_up_reader_pool(1)
+
+
+def _ocr_one(path):
+    raw_text = extract_text_easyocr(path)
+    return OCRRecord(path, raw_text, clean_ocr_text(raw_text))
+
+
+def batch_extract(source, workers=None, torch_threads=1, checkpoint_path=None):
+    """
+    Runs OCR over every image in `source` and yields OCRRecord tuples in completion order.
+    Images listed in `checkpoint_path` are skipped; new results are appended to it.
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // torch_threads)
+    truncate_partial_line(checkpoint_path)
+    done = load_checkpoint(checkpoint_path)
+    pending_paths = (path for path in iter_image_paths(source) if path not in done)
+
+    checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+    # "spawn" keeps torch's thread pools out of forked children
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(torch_threads,),
+    )
+    in_flight = {}
+
+    def collect(futures):
+        for future in futures:
+            path = in_flight.pop(future)
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"❌ OCR failed for {path}: {e}", file=sys.stderr)
+                continue
+            if checkpoint:
+                checkpoint.write(json.dumps(record._asdict()) + "\n")
+                checkpoint.flush()
+            yield record
+
+    try:
+        # Keep a bounded window of submitted work so huge backfills don't queue every path at once
+        for path in pending_paths:
+            if len(in_flight) >= workers * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from collect(finished)
+            in_flight[executor.submit(_ocr_one, path)] = path
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from collect(finished)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if checkpoint:
+            checkpoint.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("sources", nargs="+", help="Image files, directories or glob patterns")
+    arg_parser.add_argument("--workers", type=int, default=None, help="OCR processes (default: CPUs / torch threads)")
+    arg_parser.add_argument("--torch-threads", type=int, default=1, help="torch threads per worker process")
+    arg_parser.add_argument("--checkpoint", default=None, help="JSONL file used to record results and resume")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    count = 0
+    for record in batch_extract(args.sources, args.workers, args.torch_threads, args.checkpoint):
+        count += 1
+        print(json.dumps(record._asdict()))
+        print(f"[{count}] {record.path} ({len(record.cleaned_lines)} lines)", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} images in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
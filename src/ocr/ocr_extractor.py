@@ -1,70 +1,55 @@
 from PIL import Image
 import os
-import easyocr
 import re
-
-def extract_text_easyocr(image_path):
-    """Extracts raw text from an image using EasyOCR."""
-    reader = easyocr.Reader(['en'])  # English
-    results = reader.readtext(image_path, detail=0)
+from src.ocr.reader_pool import get_reader_pool
+from src.ocr.preprocessing import OCR_PREPROCESS_STEPS, load_image, preprocess_image
+from src.ocr.tiling import OCR_TILING, OCR_TILE_HEIGHT, extract_text_tiled
+from src.ocr import text_cleaner
+from src.ocr.row_reconstruction import rows_from_detections
+
+def extract_text_easyocr(image_path, preprocess_steps=None):
+    """
+    Extracts raw text from an image using a pooled (already loaded) EasyOCR reader.
+    `image_path` may also be raw image bytes or an in-memory array. `preprocess_steps`
+    defaults to OCR_PREPROCESS_STEPS; pass [] to OCR the image as-is. With OCR_TILING
+    enabled, images taller than OCR_TILE_HEIGHT are OCR'd in strips.
+    """
+    steps = OCR_PREPROCESS_STEPS if preprocess_steps is None else preprocess_steps
+    image = preprocess_image(image_path, steps) if steps else image_path
+    if OCR_TILING:
+        image = load_image(image)
+        if image.shape[0] > OCR_TILE_HEIGHT:
+            # Long receipt: OCR overlapping strips concurrently instead of the whole image
+            return extract_text_tiled(image)
+    with get_reader_pool().reader() as reader:
+        results = reader.readtext(image, detail=0)
     raw_text = "\n".join(results)  # Convert list to text format
     return raw_text
 
+def extract_detections_easyocr(image_path, preprocess_steps=None):
+    """Runs EasyOCR with detail=1 and returns (box, text, confidence) detections."""
+    steps = OCR_PREPROCESS_STEPS if preprocess_steps is None else preprocess_steps
+    image = preprocess_image(image_path, steps) if steps else image_path
+    with get_reader_pool().reader() as reader:
+        return reader.readtext(image, detail=1)
+
+def extract_receipt_rows(image_path, preprocess_steps=None, row_tolerance=0.5):
+    """Extracts (item, price, confidence) rows using the positions of the OCR boxes."""
+    detections = extract_detections_easyocr(image_path, preprocess_steps)
+    return rows_from_detections(detections, row_tolerance)
+
 def is_price(line):
     """Detects if a line is a price (e.g., 1.79, 3.49, 10.99)"""
-    return bool(re.match(r'^\d+(\.\d{2})$', line.strip()))
+    return text_cleaner.is_price(line)
 
 def merge_multiline_entries(lines):
     """Merges product names with their prices."""
-    cleaned_lines = []
-    temp_line = ""
-
-    for line in lines:
-        line = line.strip()
-
-        if is_price(line):
-            # If last entry was an item name, merge it with this price
-            if temp_line:
-                cleaned_lines.append(f"{temp_line} {line}")
-                temp_line = ""  # Reset temp storage
-            else:
-                cleaned_lines.append(line)  # Store price separately (rare case)
-        else:
-            # If line is an item name, store it temporarily
-            temp_line = line
-
-    return cleaned_lines
+    return list(text_cleaner.iter_merged_entries(lines))
 
 def clean_ocr_text(raw_text):
     """Dynamically cleans and structures OCR-extracted text for parsing."""
-    cleaned_lines = []
-    
-    for line in raw_text.split("\n"):
-        line = line.strip()
-
-        # Ignore lines that contain non-relevant text dynamically
-        if any(ignore_word in line.lower() for ignore_word in ["your cashier", "tax", "total", "payment", "credit", "balance", "auth", "change", "card", "amount", "savings"]):
-            continue
-
-        # Remove unwanted special characters (excluding currency symbols)
-        line = re.sub(r'[^\w\s\.\$,]', '', line)
-
-        # Standardize price formats (convert 1,99 -> 1.99)
-        line = re.sub(r'(\d+),(\d{2})', r'\1.\2', line)  # Convert 1,99 → 1.99
-
-        # Remove units like "Ib", "Jb", "b" that don't add value
-        line = re.sub(r'\b(lb|Ib|Jb|b)\b', '', line, flags=re.IGNORECASE)
-
-        # Remove trailing spaces
-        line = line.strip()
-
-        if line:
-            cleaned_lines.append(line)
-
-    # Merge product names with their prices
-    cleaned_lines = merge_multiline_entries(cleaned_lines)
-
-    return cleaned_lines
+    # Compiled single-pass cleaner; also merges product names with their prices
+    return list(text_cleaner.iter_clean_lines(raw_text))
 
 # Example Usage
 if __name__ == "__main__":
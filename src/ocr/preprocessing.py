@@ -0,0 +1,115 @@
+import os
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+# Load preprocessing settings
+load_dotenv()
+OCR_MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", "1600"))  # longest side in pixels after downscaling
+# Comma-separated steps applied before OCR, e.g. "crop,downscale,grayscale"; empty = raw image
+OCR_PREPROCESS_STEPS = [step.strip() for step in os.getenv("OCR_PREPROCESS_STEPS", "").split(",") if step.strip()]
+
+
+def load_image(source):
+    """Decodes a path, raw bytes or ndarray into an in-memory image (no temp files)."""
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(source, dtype=np.uint8)
+    else:
+        data = np.fromfile(os.fspath(source), dtype=np.uint8)  # also works for non-ASCII paths
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image")
+    return image
+
+
+def to_grayscale(image):
+    """Converts a BGR image to single-channel grayscale."""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def downscale(image, max_dimension=OCR_MAX_DIMENSION):
+    """Shrinks the image so its longest side is at most `max_dimension` pixels."""
+    height, width = image.shape[:2]
+    scale = max_dimension / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def normalize_contrast(image, clip_limit=2.0):
+    """Evens out lighting with CLAHE (on the lightness channel for colour images)."""
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+    if image.ndim == 2:
+        return clahe.apply(image)
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+    lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+
+def deskew(image, max_angle=15.0):
+    """Rotates the image so text lines are horizontal (small angles only)."""
+    gray = to_grayscale(image)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None:
+        return image
+
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:  # OpenCV >= 4.5 reports angles in (0, 90]
+        angle -= 90
+    if abs(angle) < 0.5 or abs(angle) > max_angle:
+        return image
+
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def crop_to_paper(image, min_area_ratio=0.2, margin=0.01):
+    """Crops to the bright receipt region; the contour search runs on a small thumbnail."""
+    height, width = image.shape[:2]
+    thumbnail = downscale(to_grayscale(image), 512)
+    scale = width / thumbnail.shape[1]
+
+    blurred = cv2.GaussianBlur(thumbnail, (5, 5), 0)
+    _, mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return image
+
+    x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    if w * h < min_area_ratio * thumbnail.shape[0] * thumbnail.shape[1]:
+        return image  # No clear paper region, keep the full frame
+
+    pad_x, pad_y = int(width * margin), int(height * margin)
+    x0 = max(0, int(x * scale) - pad_x)
+    y0 = max(0, int(y * scale) - pad_y)
+    x1 = min(width, int((x + w) * scale) + pad_x)
+    y1 = min(height, int((y + h) * scale) + pad_y)
+    return image[y0:y1, x0:x1]
+
+
+# Step name -> function; steps run in the order they are listed
+PREPROCESS_STEPS = {
+    "crop": crop_to_paper,
+    "downscale": downscale,
+    "grayscale": to_grayscale,
+    "contrast": normalize_contrast,
+    "deskew": deskew,
+}
+DEFAULT_STEPS = ["crop", "downscale", "grayscale", "contrast", "deskew"]
+
+
+def preprocess_image(source, steps=None):
+    """Loads `source` and applies the named preprocessing steps in order."""
+    image = load_image(source)
+    for step in (DEFAULT_STEPS if steps is None else steps):
+        if step not in PREPROCESS_STEPS:
+            raise ValueError(f"Unknown preprocessing step: {step}")
+        image = PREPROCESS_STEPS[step](image)
+    return image
@@ -0,0 +1,100 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# Load OCR settings
+load_dotenv()
+OCR_LANGUAGES = os.getenv("OCR_LANGUAGES", "en").split(",")
+OCR_USE_GPU = os.getenv("OCR_USE_GPU", "false").lower() in ("1", "true", "yes")
+# Max readers per process; they load lazily, so extra ones only cost memory once strips or requests overlap
+OCR_READER_POOL_SIZE = int(os.getenv("OCR_READER_POOL_SIZE", str(max(1, min(4, (os.cpu_count() or 1) // 2)))))
+OCR_READER_WARMUP = int(os.getenv("OCR_READER_WARMUP", "1"))  # readers loaded at startup (0 = lazy)
+
+
+class ReaderPool:
+    """Keeps loaded EasyOCR readers around so each request only pays for inference."""
+
+    def __init__(self, size=OCR_READER_POOL_SIZE, languages=None, gpu=OCR_USE_GPU):
+        self.size = max(1, size)
+        self.languages = languages or OCR_LANGUAGES
+        self.gpu = gpu
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_reader(self):
+        """Loads the detection and recognition weights (the slow part)."""
+        import easyocr  # pulls in torch, so only import once a reader is actually needed
+        return easyocr.Reader(self.languages, gpu=self.gpu)
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _release_slot(self):
+        with self._lock:
+            self._created -= 1
+
+    def _new_reader(self):
+        try:
+            return self._create_reader()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def warm_up(self, count=OCR_READER_WARMUP):
+        """Loads readers ahead of the first request (up to the pool size)."""
+        for _ in range(max(0, count) - self._created):
+            if not self._reserve_slot():
+                break
+            self._idle.put(self._new_reader())
+        return self._created
+
+    def _acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve_slot():
+            return self._new_reader()
+        # Pool is full: wait for another thread to hand its reader back
+        return self._idle.get(timeout=timeout)
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """Borrows a reader for the duration of the block; readers are never shared concurrently."""
+        reader = self._acquire(timeout)
+        try:
+            yield reader
+        finally:
+            self._idle.put(reader)
+
+    @property
+    def loaded(self):
+        """Number of readers loaded in this process."""
+        return self._created
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_reader_pool():
+    """Returns the process-wide reader pool, creating a fresh one in forked worker processes."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ReaderPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def warm_up_reader_pool(count=OCR_READER_WARMUP):
+    """Loads `count` readers into the process-wide pool; returns how many are loaded."""
+    return get_reader_pool().warm_up(count)
@@ -0,0 +1,113 @@
+import re
+from collections import namedtuple
+import numpy as np
+from src.ocr.text_cleaner import IGNORE_RE, NAME_CHARS_RE, UNITS_RE, parse_modifier
+
+# quantity / unit_price are set when a "2 @ 0.59" row priced the item
+ReceiptRow = namedtuple("ReceiptRow", ["item", "price", "confidence", "quantity", "unit_price"],
+                        defaults=(None, None))
+
+# A price token as EasyOCR reads it: "$3.49", "3,49", "3.49 F" (tax flag)
+PRICE_TOKEN_RE = re.compile(r'^\$?\s*(\d+)[.,](\d{2})\s*[A-Za-z]?$')
+
+
+def parse_price_token(text):
+    """Returns the price in a single OCR box, or None if the box is not a price."""
+    match = PRICE_TOKEN_RE.match(text.strip())
+    return float(f"{match.group(1)}.{match.group(2)}") if match else None
+
+
+def detections_to_arrays(detections):
+    """Splits EasyOCR detail=1 output into box-edge arrays, texts and confidences."""
+    boxes = np.asarray([box for box, _, _ in detections], dtype=float).reshape(-1, 4, 2)
+    texts = [text for _, text, _ in detections]
+    confidences = np.asarray([conf for _, _, conf in detections], dtype=float)
+    xs, ys = boxes[:, :, 0], boxes[:, :, 1]
+    return xs.min(axis=1), xs.max(axis=1), ys.min(axis=1), ys.max(axis=1), texts, confidences
+
+
+def group_rows(top, bottom, row_tolerance=0.5):
+    """
+    Assigns a row id to every box. Boxes are sorted by vertical centre and a new row
+    starts wherever the gap to the previous centre exceeds `row_tolerance` x the median
+    box height.
+    """
+    centers = (top + bottom) / 2
+    order = np.argsort(centers, kind="stable")
+    threshold = row_tolerance * max(np.median(bottom - top), 1.0)
+    row_starts = np.diff(centers[order]) > threshold
+    row_ids = np.empty(len(centers), dtype=int)
+    row_ids[order] = np.concatenate(([0], np.cumsum(row_starts)))
+    return row_ids
+
+
+def clean_item_text(text):
+    """Applies the same noise stripping as clean_ocr_text to an item name."""
+    return UNITS_RE.sub('', NAME_CHARS_RE.sub('', text)).strip()
+
+
+def rows_from_detections(detections, row_tolerance=0.5):
+    """
+    Rebuilds receipt rows from EasyOCR boxes and pairs each item with its price.
+    Prices are taken from the right-hand column (boxes starting right of the page
+    centre); everything left of the price is the item name. An item row without a
+    price is carried to the next priced row when that row has no name of its own:
+    a price-only row, or a "2 @ 0.59" quantity row, which sets the quantity and unit
+    price instead of naming the item.
+    """
+    if not detections:
+        return []
+
+    x_min, x_max, top, bottom, texts, confidences = detections_to_arrays(detections)
+    row_ids = group_rows(top, bottom, row_tolerance)
+    price_column_x = (x_min.min() + x_max.max()) / 2
+
+    # Reading order: row by row, left to right
+    order = np.lexsort((x_min, row_ids))
+    row_breaks = np.flatnonzero(np.diff(row_ids[order])) + 1
+
+    rows = []
+    pending_item, pending_confidence = None, 1.0
+    for indices in np.split(order, row_breaks):
+        if IGNORE_RE.search(" ".join(texts[i] for i in indices).lower()):
+            pending_item = None
+            continue
+
+        price, price_index = None, None
+        for i in indices[::-1]:  # rightmost price-like box in the price column
+            if x_min[i] >= price_column_x:
+                price = parse_price_token(texts[i])
+                if price is not None:
+                    price_index = i
+                    break
+
+        item_indices = [i for i in indices if i != price_index and x_min[i] < price_column_x]
+        item_text = " ".join(texts[i] for i in item_indices)
+        item = clean_item_text(item_text)
+        confidence = float(confidences[item_indices].min()) if item_indices else 1.0
+        modifier = parse_modifier(item_text) if price is not None else None
+
+        if price is None:
+            # Item name wrapped onto its own row; wait for the price row below
+            pending_item, pending_confidence = (item, confidence) if item else (None, 1.0)
+            continue
+
+        price_confidence = float(confidences[price_index])
+        if modifier or not any(ch.isalpha() for ch in item):
+            # No name on this row: it prices the wrapped name above, if there is one
+            item, confidence = (pending_item, min(confidence, pending_confidence)) if pending_item else (None, 1.0)
+        pending_item = None
+        if item:
+            quantity, unit_price = modifier or (None, None)
+            rows.append(ReceiptRow(item, price, min(confidence, price_confidence), quantity, unit_price))
+
+    return rows
+
+
+def rows_to_lines(rows):
+    """
+    Formats rows as the 'NAME 1.99' lines clean_ocr_text produces, or 'NAME 2 0.59 1.18'
+    (quantity, unit price, total) when a quantity row priced the item.
+    """
+    return [f"{row.item} {row.quantity:g} {row.unit_price:.2f} {row.price:.2f}" if row.quantity
+            else f"{row.item} {row.price:.2f}" for row in rows]
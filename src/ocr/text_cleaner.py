@@ -0,0 +1,97 @@
+import re
+
+# Lines containing any of these are receipt boilerplate, not purchases
+IGNORE_KEYWORDS = ["your cashier", "tax", "total", "payment", "credit", "balance", "auth", "change", "card", "amount", "savings"]
+
+# Compiled once at import instead of on every line
+IGNORE_RE = re.compile("|".join(re.escape(keyword) for keyword in IGNORE_KEYWORDS))
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\$,]')  # keep word chars, spaces, ".", "$" and ","
+NAME_CHARS_RE = re.compile(r'[^\w\s\.\$,%]')  # as above, but keeps "%" for names like "MILK 2%"
+DECIMAL_COMMA_RE = re.compile(r'(\d+),(\d{2})')  # 1,99 -> 1.99
+UNITS_RE = re.compile(r'\b(lb|Ib|Jb|b)\b', re.IGNORECASE)
+PRICE_RE = re.compile(r'^\d+(\.\d{2})$')
+INLINE_PRICE_RE = re.compile(r'\s\$?\d+\.\d{2}$')  # "MILK 3.49": name and price OCR'd on one line
+# A quantity / unit-price row under a wrapped item name: "2 @ 0.59", "1.05 lb @ $0.59/lb", "3 x 1.00"
+MODIFIER_RE = re.compile(r'^(?P<qty>\d+(?:[.,]\d+)?)\s*(?:lbs?|kg|oz|ea)?\s*(?:@|x|at)\s*\$?\s*'
+                         r'(?P<unit>\d+)[.,](?P<cents>\d{2})\s*(?:/\s*(?:lbs?|kg|oz|ea))?$', re.IGNORECASE)
+TRAILING_PRICE_RE = re.compile(r'^(?P<rest>.+?)\s+\$?(?P<price>\d+[.,]\d{2})$')  # "2 @ 0.59 1.18"
+
+
+def is_price(line):
+    """Detects if a line is a price (e.g., 1.79, 3.49, 10.99)"""
+    return PRICE_RE.match(line.strip()) is not None
+
+
+def parse_modifier(text):
+    """Returns (quantity, unit price) for a "2 @ 0.59" row, or None."""
+    match = MODIFIER_RE.match(text.strip())
+    if not match:
+        return None
+    return float(match.group("qty").replace(",", ".")), float(f"{match.group('unit')}.{match.group('cents')}")
+
+
+def iter_merged_entries(lines):
+    """Yields product names merged with the price line that follows them."""
+    temp_line = ""
+    for line in lines:
+        line = line.strip()
+        if PRICE_RE.match(line):
+            if temp_line:
+                yield f"{temp_line} {line}"
+                temp_line = ""
+            else:
+                yield line  # Price without a preceding item name (rare case)
+        else:
+            temp_line = line
+
+
+def iter_clean_lines(raw_text, keep_priced=False):
+    """
+    Single pass over OCR text: drops boilerplate lines, strips noise, and merges item
+    names with their prices. Yields the same lines as clean_ocr_text returns.
+    With `keep_priced`, lines that already end in a price are yielded as they are
+    instead of waiting (and usually being dropped) for a separate price line, "%" is
+    kept in names, and a "1.05 lb @ 0.59/lb" row is attached to the name above it as
+    "BANANAS 1.05 0.59" (then "BANANAS 1.05 0.59 0.62" once the price follows).
+    """
+    temp_line = ""
+    for line in raw_text.split("\n"):
+        line = line.strip()
+        lowered = line.lower()
+        if IGNORE_RE.search(lowered):
+            continue
+
+        if keep_priced and temp_line:
+            # Quantity / weight row: it belongs to the wrapped name above, not a new item
+            modifier, total = parse_modifier(line), None
+            priced = TRAILING_PRICE_RE.match(line)
+            if not modifier and priced:  # "2 @ 0.59 1.18": the line total is on the same row
+                modifier, total = parse_modifier(priced.group("rest")), priced.group("price").replace(",", ".")
+            if modifier:
+                temp_line = f"{temp_line} {modifier[0]:g} {modifier[1]:.2f}"
+                if total:
+                    yield f"{temp_line} {total}"
+                    temp_line = ""
+                continue
+
+        line = (NAME_CHARS_RE if keep_priced else SPECIAL_CHARS_RE).sub('', line)
+        if "," in line:
+            line = DECIMAL_COMMA_RE.sub(r'\1.\2', line)
+        if "b" in lowered:  # every unit token contains a "b"; removals above never add one
+            line = UNITS_RE.sub('', line)
+        line = line.strip()
+        if not line:
+            continue
+
+        # Inline merge step (see iter_merged_entries)
+        if PRICE_RE.match(line):
+            if temp_line:
+                yield f"{temp_line} {line}"
+                temp_line = ""
+            else:
+                yield line
+        elif keep_priced and INLINE_PRICE_RE.search(line):
+            yield line
+            temp_line = ""
+        else:
+            temp_line = line
@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from dotenv import load_dotenv
+from src.ocr.preprocessing import load_image
+from src.ocr.reader_pool import get_reader_pool
+from src.ocr.row_reconstruction import group_rows
+
+# Load tiling settings
+load_dotenv()
+OCR_TILING = os.getenv("OCR_TILING", "false").lower() in ("1", "true", "yes")
+OCR_TILE_HEIGHT = int(os.getenv("OCR_TILE_HEIGHT", "1200"))  # strip height in pixels
+OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "160"))  # must exceed the tallest text line
+OCR_TILE_MEMORY_MB = int(os.getenv("OCR_TILE_MEMORY_MB", "1024"))  # cap on strips OCR'd at once
+
+# Rough working-set multiplier for one readtext call: float32 input plus detector activations
+BYTES_PER_PIXEL_ESTIMATE = 3 * 4 * 8
+
+
+def split_into_strips(image, strip_height=OCR_TILE_HEIGHT, overlap=OCR_TILE_OVERLAP):
+    """Splits an image into overlapping horizontal strips; returns (top_offset, view) pairs."""
+    height = image.shape[0]
+    if height <= strip_height:
+        return [(0, image)]
+    if overlap >= strip_height:
+        raise ValueError("Tile overlap must be smaller than the tile height")
+
+    strips = []
+    step = strip_height - overlap
+    for top in range(0, height, step):
+        bottom = min(top + strip_height, height)
+        strips.append((top, image[top:bottom]))  # views, no copies
+        if bottom == height:
+            break
+    return strips
+
+
+def max_concurrent_strips(strips, memory_mb=OCR_TILE_MEMORY_MB):
+    """How many strips fit in the memory cap at once (always at least one)."""
+    tallest = max(strip.shape[0] for _, strip in strips)
+    per_strip = tallest * strips[0][1].shape[1] * BYTES_PER_PIXEL_ESTIMATE
+    return max(1, min(len(strips), (memory_mb * 1024 * 1024) // per_strip))
+
+
+def _ocr_strip(top, strip):
+    with get_reader_pool().reader() as reader:
+        detections = reader.readtext(strip, detail=1)
+    # Shift boxes back into whole-image coordinates
+    return [([[x, y + top] for x, y in box], text, conf) for box, text, conf in detections]
+
+
+def _core_bounds(strips, image_height, overlap):
+    """Non-overlapping band each strip owns: the overlap is split halfway between neighbours."""
+    bounds = []
+    for k, (top, strip) in enumerate(strips):
+        core_top = top + overlap / 2 if k > 0 else 0
+        core_bottom = top + strip.shape[0] - overlap / 2 if k < len(strips) - 1 else image_height
+        bounds.append((core_top, core_bottom))
+    return bounds
+
+
+def merge_strip_detections(strip_results, strips, image_height, overlap=OCR_TILE_OVERLAP):
+    """
+    Drops duplicate lines from the overlaps and returns detections in reading order.
+    A box is kept only by the strip whose core band contains its vertical centre, so lines
+    cut off at a strip edge are taken from the neighbour that saw them whole.
+    """
+    kept = []
+    for detections, (core_top, core_bottom) in zip(strip_results, _core_bounds(strips, image_height, overlap)):
+        for box, text, conf in detections:
+            ys = [y for _, y in box]
+            center = (min(ys) + max(ys)) / 2
+            if core_top <= center < core_bottom:
+                kept.append((box, text, conf))
+
+    if not kept:
+        return []
+    boxes = np.asarray([box for box, _, _ in kept], dtype=float)
+    top, bottom, left = boxes[:, :, 1].min(axis=1), boxes[:, :, 1].max(axis=1), boxes[:, :, 0].min(axis=1)
+    order = np.lexsort((left, group_rows(top, bottom)))
+    return [kept[i] for i in order]
+
+
+def extract_detections_tiled(image_path, strip_height=OCR_TILE_HEIGHT, overlap=OCR_TILE_OVERLAP,
+                             memory_mb=OCR_TILE_MEMORY_MB, workers=None):
+    """OCRs a tall image strip by strip, concurrently, and returns detail=1 detections."""
+    image = load_image(image_path)
+    strips = split_into_strips(image, strip_height, overlap)
+    # Each concurrent strip needs its own reader, so the pool size also bounds concurrency
+    workers = min(workers or get_reader_pool().size, max_concurrent_strips(strips, memory_mb))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        strip_results = list(executor.map(lambda s: _ocr_strip(*s), strips))
+    return merge_strip_detections(strip_results, strips, image.shape[0], overlap)
+
+
+def extract_text_tiled(image_path, **kwargs):
+    """Tiled counterpart of extract_text_easyocr: one detected text line per output line."""
+    return "\n".join(text for _, text, _ in extract_detections_tiled(image_path, **kwargs))
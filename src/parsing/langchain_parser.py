@@ -144,11 +144,15 @@ from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 import os
+import threading
 from dotenv import load_dotenv
+from src.parsing.llm_cache import LLMCache, prompt_hash
+from src.parsing.llm_client import AsyncLLMClient, create_backend
 
 # Load OpenAI API Key
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL_NAME = "gpt-4"
 
 # Define expected structured response format
 response_schemas = [
@@ -164,11 +168,63 @@ format_instructions = parser.get_format_instructions()
 
 # Initialize OpenAI LLM
 openai_model = ChatOpenAI(
-    model_name="gpt-4",
+    model_name=OPENAI_MODEL_NAME,
     openai_api_key=OPENAI_API_KEY,
     temperature=0,  # Ensures deterministic response
+    max_retries=0,  # retries are done (selectively) by llm_client
 )
 
+# Shared client: bounded concurrency, timeouts and retries for every GPT-4 call in the app
+llm_client = AsyncLLMClient(create_backend(openai_model))
+
+# Bill-parsing prompt. Its hash (with the model name) versions the LLM cache entries,
+# so editing it only invalidates cached parse_grocery_bill responses.
+BILL_PROMPT_TEMPLATE = """Extract grocery items, their quantity, price, and category from the following bill:
+        
+        {text}
+        
+        - Assign each item to a logical category (e.g., Dairy, Fruits, Bakery, Beverages, Snacks, Meat, Frozen, Household, Spices, etc.).
+        - Always use the "You Paid" price instead of the listed price when available.
+        - Ensure all numbers are correctly formatted as floating-point values.
+        - If quantity is missing, assume it is 1.
+
+        Return **only** valid JSON output structured like this:
+        
+        [
+            {{"item": "Milk", "quantity": "2", "price": "5.99", "category": "Dairy"}},
+            {{"item": "Banana", "quantity": "6", "price": "1.50", "category": "Fruits"}},
+            {{"item": "Garlic", "quantity": "1", "price": "2.99", "category": "Spices"}}
+        ]
+        
+        {format_instructions}
+        """
+
+bill_prompt = PromptTemplate(
+    template=BILL_PROMPT_TEMPLATE,
+    input_variables=["text"],
+    partial_variables={"format_instructions": format_instructions},
+)
+
+BILL_PROMPT_NAME = "parse_grocery_bill"
+BILL_PROMPT_HASH = prompt_hash(BILL_PROMPT_TEMPLATE + format_instructions, OPENAI_MODEL_NAME)
+
+# Cache of raw completions: re-processing the same OCR text costs no tokens.
+# Opened on first use, so importing the parser doesn't touch the database.
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """The process-wide LLMCache; entries from older prompt versions are dropped when it is opened."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                cache = LLMCache()
+                cache.invalidate_stale(BILL_PROMPT_NAME, BILL_PROMPT_HASH)
+                cache.invalidate_stale(CATEGORIZE_PROMPT_NAME, CATEGORIZE_PROMPT_HASH)
+                _llm_cache = cache
+    return _llm_cache
+
 def sanitize_price(price):
     """Converts price to a float and removes invalid characters."""
     price = re.sub(r"[^\d.]", "", price)  # Remove non-numeric characters except "."
@@ -200,35 +256,16 @@ def parse_grocery_bill(text):
     #     input_variables=["text"],
     #     partial_variables={"format_instructions": format_instructions},
     # )
-    prompt = PromptTemplate(
-        template="""Extract grocery items, their quantity, price, and category from the following bill:
-        
-        {text}
-        
-        - Assign each item to a logical category (e.g., Dairy, Fruits, Bakery, Beverages, Snacks, Meat, Frozen, Household, Spices, etc.).
-        - Always use the "You Paid" price instead of the listed price when available.
-        - Ensure all numbers are correctly formatted as floating-point values.
-        - If quantity is missing, assume it is 1.
-
-        Return **only** valid JSON output structured like this:
-        
-        [
-            {{"item": "Milk", "quantity": "2", "price": "5.99", "category": "Dairy"}},
-            {{"item": "Banana", "quantity": "6", "price": "1.50", "category": "Fruits"}},
-            {{"item": "Garlic", "quantity": "1", "price": "2.99", "category": "Spices"}}
-        ]
-        
-        {format_instructions}
-        """,
-        input_variables=["text"],
-        partial_variables={"format_instructions": format_instructions},
-    )
+    structured_data = get_llm_cache().get(BILL_PROMPT_NAME, BILL_PROMPT_HASH, text)
+    cache_hit = structured_data is not None
 
     try:
-        structured_data = openai_model.predict(prompt.format(text=text))
+        if not cache_hit:
+            structured_data = llm_client.predict(bill_prompt.format(text=text))
 
         # Debug: Print the raw OpenAI response before parsing
-        print("🔹 OpenAI Raw Response:", structured_data)
+        print("🔹 OpenAI Raw Response:", structured_data, "(cached)" if cache_hit else "")
+        raw_response = structured_data
 
         # Remove Markdown-like triple backticks and extra formatting
         structured_data = structured_data.strip("```json").strip("```").strip()
@@ -247,6 +284,9 @@ def parse_grocery_bill(text):
             #item["category"] = item["category"].strip().upper()
 
         if isinstance(parsed_json, list) and all(isinstance(entry, dict) for entry in parsed_json):
+            if not cache_hit:
+                # Only cache completions that parsed, so a bad response is retried next time
+                get_llm_cache().put(BILL_PROMPT_NAME, BILL_PROMPT_HASH, text, raw_response)
             return parsed_json  # Correct format
         else:
             raise ValueError("OpenAI returned an invalid JSON format")
@@ -254,3 +294,39 @@ def parse_grocery_bill(text):
     except json.JSONDecodeError as e:
         print("Failed to parse OpenAI response:", repr(structured_data)) 
         raise ValueError(f"Failed to parse OpenAI response: {e}")
+
+
+# Batched categorisation for items the category index has never seen
+CATEGORIZE_PROMPT_TEMPLATE = """Assign each grocery item below to a logical category (e.g., Dairy, Fruits, Bakery, Beverages, Snacks, Meat, Frozen, Household, Spices, etc.).
+
+{items}
+
+Return **only** a valid JSON object mapping each item name exactly as given to its category, like this:
+{{"Milk": "Dairy", "Banana": "Fruits"}}
+"""
+CATEGORIZE_PROMPT_NAME = "categorize_items"
+CATEGORIZE_PROMPT_HASH = prompt_hash(CATEGORIZE_PROMPT_TEMPLATE, OPENAI_MODEL_NAME)
+
+def categorize_items(item_names):
+    """Asks GPT-4 for the categories of several items in a single call; returns {item: category}."""
+    if not item_names:
+        return {}
+    items_text = "\n".join(f"- {name}" for name in item_names)
+
+    response = get_llm_cache().get(CATEGORIZE_PROMPT_NAME, CATEGORIZE_PROMPT_HASH, items_text)
+    cache_hit = response is not None
+    if not cache_hit:
+        response = llm_client.predict(CATEGORIZE_PROMPT_TEMPLATE.format(items=items_text))
+
+    json_match = re.search(r"\{.*\}", response, re.DOTALL)
+    try:
+        categories = json.loads(json_match.group(0)) if json_match else None
+    except json.JSONDecodeError:
+        categories = None
+    if not isinstance(categories, dict):
+        print("Failed to parse OpenAI categories:", repr(response))
+        return {}
+
+    if not cache_hit:
+        get_llm_cache().put(CATEGORIZE_PROMPT_NAME, CATEGORIZE_PROMPT_HASH, items_text, response)
+    return {name: str(categories[name]).strip() for name in item_names if categories.get(name)}
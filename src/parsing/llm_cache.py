@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load cache settings
+load_dotenv()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # 0 = never expire
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+
+def normalize_text(text):
+    """Collapses whitespace and blank lines so trivially different OCR output shares a key."""
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+
+def prompt_hash(template, model_name):
+    """Identifies a prompt version: changes whenever the template or the model changes."""
+    return hashlib.sha256(f"{model_name}\0{template}".encode("utf-8")).hexdigest()[:16]
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM completions. Entries are keyed by the normalised input
+    text plus the prompt hash, and grouped by prompt name so a prompt change only
+    invalidates that prompt's entries.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                prompt_name TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_prompt ON llm_cache (prompt_name, prompt_hash)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def _key(prompt_hash_, text):
+        return hashlib.sha256(f"{prompt_hash_}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt_name, prompt_hash_, text):
+        """Returns the cached completion for this prompt version and input, or None."""
+        key = self._key(prompt_hash_, text)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._entries -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, prompt_name, prompt_hash_, text, response):
+        """Stores a completion, evicting the least recently used entries past max_entries."""
+        key = self._key(prompt_hash_, text)
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, prompt_name, prompt_hash, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt_name, prompt_hash_, response, now, now),
+            )
+            if not exists:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                    (self._entries - self.max_entries,),
+                )
+                self._entries = self.max_entries
+            self._conn.commit()
+
+    def invalidate_stale(self, prompt_name, current_hash):
+        """Drops entries written by older versions of one prompt; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_cache WHERE prompt_name = ? AND prompt_hash != ?", (prompt_name, current_hash)
+            )
+            self._conn.commit()
+            self._entries -= cursor.rowcount
+            return cursor.rowcount
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current number of entries."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": self._entries,
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import random
+import threading
+import weakref
+from dotenv import load_dotenv
+
+# Load LLM client settings
+load_dotenv()
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # "fake" runs offline with canned responses
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))  # in-flight requests per process
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))  # per attempt
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "90"))  # whole call, retries and queueing included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+
+
+# Transient failures worth another attempt, matched by class name so neither the openai
+# package nor its version (0.x "Timeout", 1.x "APITimeoutError") has to be imported here.
+# Auth, invalid-request and response-parsing errors fail on the first attempt.
+RETRYABLE_ERROR_NAMES = {"RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError",
+                         "ConnectError", "ConnectTimeout", "ReadTimeout"}
+
+
+class LLMCallError(RuntimeError):
+    """Raised when an LLM call fails after all retries or runs past its deadline."""
+
+    @property
+    def timed_out(self):
+        """True when the last attempt timed out or the deadline ran out (vs. a failed request)."""
+        return isinstance(self.__cause__, TimeoutError)
+
+
+def is_retryable(error):
+    """True for rate limits (HTTP 429), timeouts and connection errors."""
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    if getattr(error, "status_code", None) == 429 or getattr(error, "http_status", None) == 429:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class OpenAIChatBackend:
+    """Sends prompts to a LangChain chat model (e.g. ChatOpenAI) using its async API."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def complete(self, prompt):
+        message = await self.model.ainvoke(prompt)
+        return message.content
+
+
+class FakeLLMBackend:
+    """
+    Offline stand-in for load tests. `latency` is a number of seconds or a function of a
+    random.Random returning one (e.g. a heavy-tailed distribution); `response` is a string
+    or a function of the prompt; `failure_rate` makes a share of calls raise.
+    """
+
+    def __init__(self, response="[]", latency=0.05, failure_rate=0.0, seed=None):
+        self.response = response
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+
+    async def complete(self, prompt):
+        delay = self.latency(self._rng) if callable(self.latency) else self.latency
+        await asyncio.sleep(delay)
+        if self._rng.random() < self.failure_rate:
+            raise ConnectionError("Fake LLM backend failure")
+        return self.response(prompt) if callable(self.response) else self.response
+
+
+class AsyncLLMClient:
+    """
+    Shared LLM client: at most `max_concurrency` requests in flight, a timeout per attempt,
+    an overall deadline per call, and retries of transient errors (see is_retryable) with
+    exponential backoff and full jitter.
+    `predict` is a blocking wrapper for synchronous code such as Flask views; it runs the
+    call on a background event loop owned by the client.
+    """
+
+    def __init__(self, backend, max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT_SECONDS,
+                 deadline=LLM_DEADLINE_SECONDS, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE_SECONDS, backoff_max=LLM_BACKOFF_MAX_SECONDS):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.counters = {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0}
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> semaphore (they can't be shared)
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _attempt(self, prompt, timeout, give_up_at):
+        async with self._semaphore():
+            # The per-attempt timeout starts once a slot is free; queueing only uses up the deadline
+            remaining = give_up_at - asyncio.get_running_loop().time()
+            return await asyncio.wait_for(self.backend.complete(prompt), min(timeout, remaining))
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def apredict(self, prompt, timeout=None, deadline=None):
+        """Returns the completion text for `prompt`; raises LLMCallError when out of retries or time."""
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + (deadline or self.deadline)
+        timeout = timeout or self.timeout
+        self.counters["calls"] += 1
+        attempt, error = 0, TimeoutError("LLM call deadline exceeded")
+
+        for attempt in range(self.max_retries + 1):
+            remaining = give_up_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                return await asyncio.wait_for(self._attempt(prompt, timeout, give_up_at), remaining)
+            except asyncio.TimeoutError:
+                self.counters["timeouts"] += 1
+                error = TimeoutError(f"LLM call timed out (attempt timeout {timeout:.1f}s)")
+            except Exception as e:
+                error = e
+                if not is_retryable(e):
+                    break
+
+            if attempt < self.max_retries:
+                self.counters["retries"] += 1
+                await asyncio.sleep(min(self._backoff(attempt), max(0.0, give_up_at - loop.time())))
+
+        self.counters["failures"] += 1
+        raise LLMCallError(f"LLM call failed after {attempt + 1} attempt(s): {error}") from error
+
+    def _background_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-client-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine):
+        """Runs a coroutine on the client's event loop and blocks until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._background_loop()).result()
+
+    def predict(self, prompt, timeout=None, deadline=None):
+        """Blocking version of apredict for the existing synchronous call sites."""
+        return self.run(self.apredict(prompt, timeout, deadline))
+
+    def stats(self):
+        return dict(self.counters)
+
+
+def create_backend(model, name=LLM_BACKEND):
+    """The backend selected by LLM_BACKEND: "openai" wraps `model`, "fake" needs no network."""
+    if name == "fake":
+        return FakeLLMBackend()
+    if getattr(model, "max_retries", 0):
+        # AsyncLLMClient owns retries; the SDK's own would multiply the attempts per call
+        model.max_retries = 0
+    return OpenAIChatBackend(model)
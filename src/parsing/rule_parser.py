@@ -0,0 +1,165 @@
+import os
+import re
+from dotenv import load_dotenv
+from src.ocr.text_cleaner import iter_clean_lines
+from src.parsing.langchain_parser import parse_grocery_bill, categorize_items
+from src.knowledge_graph.neo4j_connector import CATEGORY_MAPPING
+from src.knowledge_graph.category_index import CategoryIndex
+
+# Load parser settings
+load_dotenv()
+PARSER_FAST_PATH = os.getenv("PARSER_FAST_PATH", "true").lower() in ("1", "true", "yes")
+PARSER_MIN_CONFIDENCE = float(os.getenv("PARSER_MIN_CONFIDENCE", "0.75"))  # per-line threshold
+PARSER_MIN_COVERAGE = float(os.getenv("PARSER_MIN_COVERAGE", "0.5"))  # below this, send the whole bill to GPT-4
+
+# Cleaned lines look like "ORGANIC BANANAS 1.99" (clean_ocr_text merges names and prices)
+LINE_RE = re.compile(r'^(?P<name>.*?)\s*\$?(?P<price>\d+\.\d{2})$')
+LEADING_QTY_RE = re.compile(r'^(?P<qty>\d{1,2})\s*[xX]\s+(?P<name>.+)$')  # "2 x MILK"
+TRAILING_QTY_RE = re.compile(r'^(?P<name>.+?)\s+(?P<qty>\d{1,2})\s*[xX]$')  # "MILK 2x"
+# "MILK 2 1.50" (count, unit price) or "BANANAS 1.05 0.59" (weight, price per lb) before the line total
+UNIT_PRICE_RE = re.compile(r'^(?P<name>.+?)\s+(?P<qty>\d+(?:\.\d+)?)\s+\$?(?P<unit>\d+\.\d{2})$')
+MAX_ITEM_PRICE = 200.0
+# A price with no name before it (clean_ocr_text keeps these when nothing precedes the price)
+BARE_PRICE_RE = re.compile(r'^\$?\d+\.\d{2}$')
+# Lines that qualify the item above them rather than being purchases
+PAID_PRICE_RE = re.compile(r'^you\s*paid\b', re.IGNORECASE)  # the price actually charged
+LISTED_PRICE_RE = re.compile(r'^(?:regular|reg|sale|unit|list|orig(?:inal)?)?\s*price\b|^was\b|^you\s*sav', re.IGNORECASE)
+NON_ITEM_RE = re.compile(r'^thank\s*you\b|^welcome\b', re.IGNORECASE)
+
+
+# Used when no index learned from the graph is passed in
+DEFAULT_CATEGORY_INDEX = CategoryIndex.from_mapping(CATEGORY_MAPPING)
+
+
+def _format_quantity(quantity):
+    return str(int(quantity)) if float(quantity).is_integer() else str(quantity)
+
+
+def line_role(line):
+    """
+    'item' for a purchase line; 'paid' / 'listed' for "You Paid 2.99" / "Regular Price 3.99"
+    lines that belong to the item above; 'skip' for bare prices and sign-offs.
+    """
+    line = line.strip()
+    if BARE_PRICE_RE.match(line) or NON_ITEM_RE.match(line):
+        return "skip"
+    if PAID_PRICE_RE.match(line):
+        return "paid"
+    if LISTED_PRICE_RE.match(line):
+        return "listed"
+    return "item"
+
+
+def parse_line(line, category_index=DEFAULT_CATEGORY_INDEX):
+    """
+    Extracts item, quantity and price from one cleaned receipt line.
+    Returns (entry, confidence); entry has the same keys as parse_grocery_bill output,
+    with category None when the item is not in `category_index`.
+    """
+    match = LINE_RE.match(line.strip())
+    if not match or line_role(line) != "item":
+        return None, 0.0
+
+    name, price = " ".join(match.group("name").split()), float(match.group("price"))
+    quantity, confidence = "1", 1.0
+
+    unit_match = UNIT_PRICE_RE.match(name)
+    qty_match = LEADING_QTY_RE.match(name) or TRAILING_QTY_RE.match(name)
+    if unit_match:
+        qty, unit = float(unit_match.group("qty")), float(unit_match.group("unit"))
+        if abs(qty * unit - price) <= 0.02:
+            name, quantity = unit_match.group("name"), _format_quantity(qty)
+        else:
+            confidence -= 0.4  # Numbers that don't multiply out: could be a "You Paid" / sale line
+    elif qty_match:
+        name, quantity = qty_match.group("name"), qty_match.group("qty")
+
+    letters = sum(ch.isalpha() for ch in name)
+    if letters < 2:
+        return None, 0.0  # Bare price or a code, nothing to name the item with
+    if letters / len(name.replace(" ", "")) < 0.6:
+        confidence -= 0.3  # Mostly digits/symbols: likely an SKU or garbled OCR
+    if any(ch.isdigit() for ch in name):
+        confidence -= 0.1
+    if price == 0:
+        return None, 0.0  # Nothing was paid: boilerplate, not a purchase
+    if price > MAX_ITEM_PRICE:
+        confidence -= 0.5
+
+    entry = {"item": name.title(), "quantity": quantity, "price": price, "category": category_index.lookup(name)}
+    return entry, max(confidence, 0.0)
+
+
+def parse_grocery_bill_fast(text, category_index=DEFAULT_CATEGORY_INDEX, min_confidence=PARSER_MIN_CONFIDENCE,
+                            min_coverage=PARSER_MIN_COVERAGE, stats=None, lines=None):
+    """
+    Parses cleaned receipt lines locally and sends only low-confidence lines (or, below
+    `min_coverage`, the whole bill) to GPT-4; see TECHNICAL.md "Rule-based fast path".
+    Pass `lines` for OCR_ROW_MODE output; `stats` (optional dict) receives per-bill counters.
+    """
+    stats = stats if stats is not None else {}
+    lines = list(iter_clean_lines(text, keep_priced=True)) if lines is None else list(lines)
+
+    parsed, leftovers = [], []
+    previous = None  # the parsed entry of the last item line, or None if it went to GPT-4
+    item_lines = 0
+    for line in lines:
+        role = line_role(line)
+        if role == "skip":
+            continue
+        if role != "item":
+            # "You Paid" / "Regular Price" qualify the item above: apply the paid price locally,
+            # or keep the line next to its item for GPT-4
+            if previous is None:
+                if leftovers:
+                    leftovers.append(line)
+            elif role == "paid":
+                match = LINE_RE.match(line.strip())
+                if match and float(match.group("price")) > 0:
+                    previous["price"] = float(match.group("price"))
+            continue
+        item_lines += 1
+        entry, confidence = parse_line(line, category_index)
+        if entry and confidence >= min_confidence:
+            parsed.append(entry)
+            previous = entry
+        else:
+            leftovers.append(line)
+            previous = None
+
+    if not item_lines or len(parsed) / item_lines < min_coverage:
+        stats.update(local_lines=0, llm_lines=len(lines), llm_calls=1, categorized_items=0)
+        return parse_grocery_bill(text)
+
+    categorize_calls = []
+    def categorize(names):
+        categorize_calls.append(len(names))
+        return categorize_items(names)
+
+    unseen = [entry["item"] for entry in parsed if not entry["category"]]
+    if unseen:
+        # Like the leftovers below: a failed categorise call leaves the items Uncategorized, not the bill unparsed
+        try:
+            resolved = category_index.resolve(unseen, categorize)
+        except Exception as e:
+            print(f"⚠️ GPT-4 categorisation of {len(unseen)} item(s) failed, storing them as Uncategorized: {e}")
+            stats["categorize_failed_items"] = len(unseen)
+            resolved = {}
+        for entry in parsed:
+            if not entry["category"]:
+                entry["category"] = resolved.get(entry["item"], "Uncategorized")
+
+    stats.update(local_lines=len(parsed), llm_lines=len(leftovers),
+                 llm_calls=int(bool(leftovers)) + len(categorize_calls), categorized_items=sum(categorize_calls))
+    if leftovers:
+        # The local items stand on their own: a bad GPT-4 reply for the leftovers loses only those lines
+        try:
+            llm_items = parse_grocery_bill("\n".join(leftovers))
+        except Exception as e:
+            print(f"⚠️ GPT-4 parse of {len(leftovers)} leftover line(s) failed, keeping local items: {e}")
+            stats["llm_failed_lines"] = len(leftovers)
+            return parsed
+        if isinstance(llm_items, dict) and "items" in llm_items:
+            llm_items = llm_items["items"]
+        parsed.extend(llm_items)
+    return parsed
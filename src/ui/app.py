@@ -3,6 +3,7 @@ import requests
 import os
 from PIL import Image
 import io
+import uuid
 
 API_URL = "http://127.0.0.1:5000"
 
@@ -59,7 +60,7 @@ if "grocery_data" not in st.session_state:
 if "show_data" not in st.session_state:
     st.session_state["show_data"] = False
 if "session_id" not in st.session_state:
-    st.session_state["session_id"] = None
+    st.session_state["session_id"] = str(uuid.uuid4())[:8]  # conversation memory is kept per session
 
 # File Upload
 uploaded_file = st.file_uploader("📤 Upload Your Grocery Bill Image", type=["png", "jpg", "jpeg"])
@@ -82,7 +83,8 @@ if uploaded_file:
         else:
             with st.spinner("Processing..."):
                 files = {"file": open(file_path, "rb")}
-                response = requests.post(f"{API_URL}/upload_bill", files=files)
+                # durable: the spending totals below are read right away and must include this bill
+                response = requests.post(f"{API_URL}/upload_bill", files=files, data={"durable": "true"})
 
             if response.status_code == 200:
                 try:
@@ -105,17 +107,19 @@ if st.session_state["show_data"] and len(st.session_state["grocery_data"]) > 0:
     st.subheader("📊 Spending by Category")
     categories = list(set([item["category"] for item in st.session_state["grocery_data"]]))
 
-    for category in categories:
-        res = requests.get(f"{API_URL}/spending/{category}")
-        
-        if res.status_code == 200:
-            try:
-                total_spent = res.json().get("total_spent", 0.0)
+    # One request for every category instead of one per category
+    res = requests.get(f"{API_URL}/spending", params={"categories": ",".join(categories)})
+
+    if res.status_code == 200:
+        try:
+            spending = res.json().get("spending", {})
+            for category in categories:
+                total_spent = spending.get(category.strip().lower(), 0.0)
                 st.write(f"**{category}:** ${total_spent:.2f}")
-            except requests.exceptions.JSONDecodeError:
-                st.warning(f"⚠️ Could not parse spending data for {category}.")
-        else:
-            st.warning(f"⚠️ API request failed for category: {category}")
+        except requests.exceptions.JSONDecodeError:
+            st.warning("⚠️ Could not parse spending data.")
+    else:
+        st.warning("⚠️ API request failed for spending by category.")
 
 # AI Chatbot
 st.subheader("💬 Ask AI About Your Grocery Data")
@@ -124,7 +128,8 @@ def process_question(question):
     if question:
         with st.spinner("Thinking..."):
             response = requests.post(f"{API_URL}/ask", json={
-                "question": question
+                "question": question,
+                "session_id": st.session_state["session_id"]
             })
         
         if response.status_code == 200:
@@ -156,7 +161,7 @@ if st.button("🤖 Ask AI", use_container_width=True, type="primary"):
 # Add a button to view conversation history
 if st.button("📜 View Conversation History"):
     try:
-        memory_response = requests.get(f"{API_URL}/memory")
+        memory_response = requests.get(f"{API_URL}/memory", params={"session_id": st.session_state["session_id"]})
         if memory_response.status_code == 200:
             memory_data = memory_response.json()
             st.subheader("Conversation History")
@@ -178,7 +183,10 @@ if st.button("📜 View Conversation History"):
 # Add a button to clear conversation history
 if st.button("🗑️ Clear Conversation History"):
     try:
-        memory_manager.clear_memory()
-        st.success("Conversation history cleared!")
+        clear_response = requests.post(f"{API_URL}/memory/clear", json={"session_id": st.session_state["session_id"]})
+        if clear_response.status_code == 200:
+            st.success("Conversation history cleared!")
+        else:
+            st.error("❌ Failed to clear conversation history.")
     except Exception as e:
         st.error(f"Failed to clear conversation history: {e}")
\ No newline at end of file
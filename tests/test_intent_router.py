@@ -0,0 +1,32 @@
+from datetime import date
+
+from src.api.intent_router import route_question
+
+KNOWN_CATEGORIES = {"dairy", "bakery", "vegetables"}
+
+
+def test_known_category_without_purchases_still_returns_a_row():
+    routed = route_question("How much did I spend on vegetables?", known_categories=KNOWN_CATEGORIES)
+
+    assert routed.template.name == "category_spend"
+    assert routed.params == {"user": "Sanjana", "categories": ["vegetables"]}
+    # Every asked category gets a row, $0 when it has no CategorySpend node yet
+    assert "UNWIND $categories AS category" in routed.cypher
+    assert "OPTIONAL MATCH (s:CategorySpend" in routed.cypher
+    assert "coalesce(s.total_spent, 0)" in routed.cypher
+
+
+def test_ranged_category_spend_returns_zero_for_empty_ranges():
+    routed = route_question("How much did I spend on vegetables last month?", today=date(2026, 10, 16),
+                            known_categories=KNOWN_CATEGORIES)
+
+    assert routed.template.name == "category_spend"
+    assert routed.params["categories"] == ["vegetables"]
+    assert (routed.params["start"], routed.params["end"]) == ("2026-09-01", "2026-10-01")
+    assert "UNWIND $categories AS category" in routed.cypher
+    assert "OPTIONAL MATCH" in routed.cypher
+    assert "coalesce(SUM(r.price), 0)" in routed.cypher
+
+
+def test_unknown_category_goes_to_gpt4():
+    assert route_question("How much did I spend on milk?", known_categories=KNOWN_CATEGORIES) is None